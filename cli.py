@@ -1,46 +1,199 @@
+import hashlib
+import logging
 import os
 import shutil
-import subprocess
+import stat
+import tarfile
 import tempfile
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, Union
+
+import requests
+import urllib3
+
+_LOGGER = logging.getLogger(__name__)
+
+# Buffer size used when writing and hashing the CLI binary
+_CHUNK_SIZE = 256 * 1024
+
+# Archives at least this large are fetched as parallel byte ranges when the server supports it
+_SEGMENTED_MIN_SIZE = 8 * 1024 * 1024
+_SEGMENTS = 4
 
 
 class FlightctlCLI:
-    def __init__(self, api_url: str, arch: str = "amd64", os_name: str = "linux"):
+    def __init__(self, api_url: str, arch: str = "amd64", os_name: str = "linux", verify: Union[bool, str] = True):
+        self.logger = _LOGGER
         self.api_url = api_url.rstrip("/")
+        self.verify = verify  # requests-style TLS setting: True, False, or a CA bundle path
         self.arch = arch
         self.os_name = os_name
         self.install_dir = os.environ.get("FLIGHTCTL_CLI_DIR", os.path.expanduser("~/.local/bin"))
         self.cli_path = os.path.join(self.install_dir, "flightctl")
+        self.checksum_path = f"{self.cli_path}.sha256"
+
+        domain = urllib.parse.urlparse(self.api_url).netloc
+        domain_prefix = domain.split("api.", 1)[-1]
+        self.cli_url = f"https://cli-artifacts.{domain_prefix}/{arch}/{os_name}/flightctl-{os_name}-{arch}.tar.gz"
+
+        # Make a previously installed CLI resolvable without a fresh download
+        path_entries = os.environ.get("PATH", "").split(os.pathsep)
+        if self.install_dir not in path_entries:
+            os.environ["PATH"] = os.pathsep.join([self.install_dir] + [p for p in path_entries if p])
 
     def download(self) -> None:
         """
         Downloads and installs the flightctl CLI matching the domain of the API server.
         Installs to a user-writable directory (default: ~/.local/bin).
-        If CLI is already available system-wide, skips download.
+        If CLI is already available system-wide, or a verified copy was installed
+        by a previous run, skips download.
         """
         # Check if flightctl is already available system-wide
         existing_cli = shutil.which("flightctl")
-        if existing_cli:
-            print("flightctl CLI already available system-wide, skipping download")
+        if existing_cli and os.path.abspath(existing_cli) != os.path.abspath(self.cli_path):
+            self.logger.info("flightctl CLI already available at %s, skipping download", existing_cli)
             self.cli_path = existing_cli
             return
 
-        domain = urllib.parse.urlparse(self.api_url).netloc
-        domain_prefix = domain.split("api.", 1)[-1]
-        cli_url = f"https://cli-artifacts.{domain_prefix}/{self.arch}/{self.os_name}/flightctl-{self.os_name}-{self.arch}.tar.gz"
-
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tar_path = os.path.join(tmpdir, "flightctl.tar.gz")
-            subprocess.run(["curl", "-kfLo", tar_path, cli_url], check=True)
-            subprocess.run(["tar", "-xvf", tar_path, "-C", tmpdir], check=True)
+        if self._is_installed():
+            self.logger.debug("Using previously installed flightctl CLI at %s", self.cli_path)
+            return
 
-            extracted_path = os.path.join(tmpdir, "flightctl")
-            if not os.path.isfile(extracted_path):
+        # Stage the binary next to its final path so installing it is a same-filesystem rename
+        os.makedirs(self.install_dir, exist_ok=True)
+        fd, partial_path = tempfile.mkstemp(dir=self.install_dir, prefix=".flightctl-", suffix=".partial")
+        os.close(fd)
+        try:
+            self.logger.info("Downloading flightctl CLI from %s", self.cli_url)
+            digest = self._fetch_binary(self.cli_url, partial_path)
+            if digest is None:
                 raise RuntimeError("Failed to extract flightctl binary")
 
-            os.makedirs(self.install_dir, exist_ok=True)
-            shutil.move(extracted_path, self.cli_path)
-            os.chmod(self.cli_path, 0o755)
+            os.chmod(partial_path, 0o755)
+            os.replace(partial_path, self.cli_path)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.unlink(partial_path)
+            raise
+
+        st = os.stat(self.cli_path)
+        with open(self.checksum_path, "w") as f:
+            f.write(f"{digest} {st.st_size} {st.st_mtime_ns}\n")
+        self.logger.info("Installed flightctl CLI to %s", self.cli_path)
+
+    def _is_installed(self) -> bool:
+        """
+        Returns True if the CLI already sits in install_dir and, when a .sha256
+        sidecar was recorded at install time, its contents still match. The binary
+        is only re-hashed if its size or mtime differ from those in the sidecar.
+        """
+        try:
+            st = os.stat(self.cli_path)
+        except FileNotFoundError:
+            return False
+        if not stat.S_ISREG(st.st_mode) or not os.access(self.cli_path, os.X_OK):
+            return False
+        try:
+            with open(self.checksum_path) as f:
+                fields = f.read().split()
+        except FileNotFoundError:
+            return True
+        if not fields:
+            return False
+        if fields[1:] == [str(st.st_size), str(st.st_mtime_ns)]:
+            return True
+        digest = hashlib.sha256()
+        with open(self.cli_path, "rb") as f:
+            while chunk := f.read(_CHUNK_SIZE):
+                digest.update(chunk)
+        return digest.hexdigest() == fields[0]
+
+    def _fetch_binary(self, cli_url: str, dest_path: str) -> Optional[str]:
+        """
+        Downloads the CLI tarball and writes the flightctl binary to dest_path.
+        Small archives, or servers without byte-range support, are streamed from the
+        socket straight through tarfile. Large archives on range-capable servers are
+        fetched in parallel segments into an unlinked temporary file first.
+        Returns the SHA-256 hex digest of the written binary, or None if the
+        archive contains no flightctl binary.
+        """
+        try:
+            with requests.get(
+                cli_url, stream=True, verify=self.verify, timeout=60, headers={"Accept-Encoding": "identity"}
+            ) as resp:
+                resp.raise_for_status()
+                size = self._segmentable_size(resp)
+                if size is None:
+                    resp.raw.decode_content = True
+                    return self._extract_binary(resp.raw, dest_path)
+
+                self.logger.debug("Downloading %d bytes in %d parallel segments", size, _SEGMENTS)
+                segment_size = -(-size // _SEGMENTS)
+                ranges = [(start, min(start + segment_size, size) - 1) for start in range(0, size, segment_size)]
+                with tempfile.TemporaryFile(dir=self.install_dir) as archive_file:
+                    fd = archive_file.fileno()
+                    with ThreadPoolExecutor(max_workers=len(ranges) - 1 or 1) as executor:
+                        futures = [
+                            executor.submit(self._fetch_range, resp.url, start, end, fd) for start, end in ranges[1:]
+                        ]
+                        # The response already open serves the first segment
+                        _copy_to_offset(resp.raw, fd, 0, ranges[0][1] + 1)
+                        for future in futures:
+                            future.result()
+                    return self._extract_binary(archive_file, dest_path)
+        except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
+            # Reading resp.raw directly surfaces mid-stream failures as urllib3, not requests, errors
+            raise RuntimeError(f"Failed to download flightctl CLI from {cli_url}: {e}")
+        except tarfile.TarError as e:
+            raise RuntimeError(f"Failed to extract flightctl CLI archive: {e}")
+
+    @staticmethod
+    def _segmentable_size(resp: requests.Response) -> Optional[int]:
+        """Returns the archive size if it is worth fetching in parallel byte ranges, else None."""
+        if str(resp.headers.get("Accept-Ranges", "")).lower() != "bytes":
+            return None
+        if resp.headers.get("Content-Encoding", "identity") != "identity":
+            return None
+        try:
+            size = int(resp.headers["Content-Length"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        return size if size >= _SEGMENTED_MIN_SIZE else None
+
+    def _fetch_range(self, url: str, start: int, end: int, fd: int) -> None:
+        headers = {"Range": f"bytes={start}-{end}", "Accept-Encoding": "identity"}
+        with requests.get(url, headers=headers, stream=True, verify=self.verify, timeout=60) as resp:
+            resp.raise_for_status()
+            if resp.status_code != 206:
+                raise RuntimeError(f"Server ignored range request for bytes {start}-{end} of {url}")
+            _copy_to_offset(resp.raw, fd, start, end - start + 1)
+
+    @staticmethod
+    def _extract_binary(fileobj: Any, dest_path: str) -> Optional[str]:
+        """Streams a .tar.gz from fileobj and writes its flightctl member to dest_path."""
+        digest = hashlib.sha256()
+        with tarfile.open(fileobj=fileobj, mode="r|gz") as archive:
+            for member in archive:
+                if not member.isfile() or os.path.basename(member.name) != "flightctl":
+                    continue
+                src = archive.extractfile(member)
+                if src is None:
+                    break
+                with open(dest_path, "wb") as dst:
+                    while chunk := src.read(_CHUNK_SIZE):
+                        digest.update(chunk)
+                        dst.write(chunk)
+                return digest.hexdigest()
+        return None
+
 
-            os.environ["PATH"] = f"{self.install_dir}:{os.environ.get('PATH', '')}"
+def _copy_to_offset(src: Any, fd: int, offset: int, length: int) -> None:
+    """Copies exactly length bytes from src into fd starting at offset."""
+    while length > 0:
+        chunk = src.read(min(_CHUNK_SIZE, length))
+        if not chunk:
+            raise RuntimeError("Connection closed before the CLI archive was fully downloaded")
+        os.pwrite(fd, chunk, offset)
+        offset += len(chunk)
+        length -= len(chunk)
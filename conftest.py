@@ -0,0 +1,108 @@
+"""Shared pytest fixtures for the Flight Control MCP Server test suite."""
+
+import importlib
+
+import pytest
+import requests
+import urllib3
+import yaml
+
+from resource_queries import Configuration
+
+# A client.yaml as written by `flightctl login`
+CLIENT_YAML = {
+    "service": {"server": "https://api.flightctl.example.com", "insecureSkipVerify": True},
+    "authentication": {
+        "auth-provider": {
+            "config": {
+                "server": "https://auth.flightctl.example.com/realms/flightctl",
+                "client-id": "flightctl",
+                "refresh-token": "eyJ...",
+            }
+        }
+    },
+}
+
+
+# Modules with noticeable import cost that several test files use
+_PREIMPORT_MODULES = ("mcp.server.fastmcp", "uvicorn", "yaml", "requests", "resource_queries", "cli")
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-integration",
+        action="store_true",
+        default=False,
+        help="run tests marked integration against the configured Flight Control instance",
+    )
+    parser.addoption(
+        "--slow",
+        action="store_true",
+        default=False,
+        help="run tests marked subprocess_server that spawn main.py as a real server process",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip integration and subprocess server tests unless opted in, so default runs stay local and fast."""
+    skip_integration = pytest.mark.skip(reason="integration test; use --run-integration to run")
+    skip_subprocess = pytest.mark.skip(reason="spawns a server process; use --slow to run")
+    run_integration = config.getoption("--run-integration")
+    run_slow = config.getoption("--slow")
+    for item in items:
+        if not run_integration and "integration" in item.keywords:
+            item.add_marker(skip_integration)
+        if not run_slow and "subprocess_server" in item.keywords:
+            item.add_marker(skip_subprocess)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _preimport():
+    """Import heavy modules once per session so no single test pays the warm-up cost."""
+    for name in _PREIMPORT_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            # Leave the failure to the tests that need the module, e.g. test_imports
+            pass
+
+
+@pytest.fixture(scope="session")
+def live_config():
+    """Load the live Flight Control configuration once per session."""
+    config = Configuration()
+    if not config.api_base_url:
+        pytest.skip("No live Flight Control instance configured")
+    return config
+
+
+@pytest.fixture(scope="session")
+def live_reachable(live_config):
+    """Probe the live API once per session so an unreachable instance costs one timeout, not one per test."""
+    try:
+        requests.head(live_config.api_base_url, timeout=2, verify=live_config.get_ssl_verify())
+    except requests.exceptions.RequestException:
+        return False
+    return True
+
+
+@pytest.fixture(scope="session")
+def parsed_client_yaml(tmp_path_factory):
+    """Write CLIENT_YAML once per session and return its path; tests must treat the file as read-only."""
+    path = tmp_path_factory.mktemp("cfg") / "client.yaml"
+    with path.open("w") as f:
+        yaml.dump(CLIENT_YAML, f, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper))
+    return path
+
+
+@pytest.fixture(autouse=True)
+def _block_unmocked_http(request, monkeypatch):
+    """Fail unit tests that open a network connection; integration and live tests may still connect."""
+    if request.node.get_closest_marker("integration") or request.node.get_closest_marker("live"):
+        return
+
+    def refuse(address, *args, **kwargs):
+        raise RuntimeError(f"Unmocked HTTP connection in unit test: {address[0]}:{address[1]}")
+
+    # Block at socket creation rather than HTTPAdapter.send so tests can drive urllib3's retry handling
+    monkeypatch.setattr(urllib3.util.connection, "create_connection", refuse)
@@ -1,5 +1,7 @@
+import asyncio
+import atexit
 import os
-from typing import List, Dict, Any, Literal
+from typing import List, Dict, Any, Literal, Optional, Tuple, cast, get_args
 from mcp.server.fastmcp import FastMCP
 from resource_queries import FlightControlClient, Configuration, setup_logging
 from cli import FlightctlCLI
@@ -10,26 +12,39 @@ setup_logging()
 mcp = FastMCP("mcp-server")
 
 # Global variables for lazy initialization
+_config = None
 _client = None
 _cli = None
+_cli_lock = asyncio.Lock()
+
+
+def get_config():
+    """Get or create the shared Configuration instance."""
+    global _config
+    if _config is None:
+        _config = Configuration()
+    return _config
 
 
 def get_client():
     """Get or create the FlightControlClient instance."""
     global _client
     if _client is None:
-        config = Configuration()
-        _client = FlightControlClient(config)
+        _client = FlightControlClient(get_config())
+        atexit.register(_client.close)
     return _client
 
 
-def get_cli():
-    """Get or create the FlightctlCLI instance."""
+async def get_cli():
+    """Get or create the FlightctlCLI instance, downloading the CLI exactly once."""
     global _cli
-    if _cli is None:
-        config = Configuration()
-        _cli = FlightctlCLI(config.api_base_url)  # type: ignore
-        _cli.download()
+    async with _cli_lock:
+        if _cli is None:
+            config = get_config()
+            cli = FlightctlCLI(config.api_base_url, verify=config.get_ssl_verify())  # type: ignore
+            # The download can take seconds; keep the event loop free for other tool calls
+            await asyncio.to_thread(cli.download)
+            _cli = cli
     return _cli
 
 
@@ -104,7 +119,9 @@ async def query_devices(
     Raises:
         RuntimeError: If a network or HTTP error occurs while querying the MCP server.
     """
-    return get_client().query_devices(label_selector=label_selector, field_selector=field_selector, limit=limit)
+    return await asyncio.to_thread(
+        get_client().query_devices, label_selector=label_selector, field_selector=field_selector, limit=limit
+    )
 
 
 @mcp.tool()
@@ -167,7 +184,9 @@ async def query_fleets(label_selector: str = "", field_selector: str = "", limit
     Raises:
         RuntimeError: If a network or HTTP error occurs while querying the MCP server.
     """
-    return get_client().query_fleets(label_selector=label_selector, field_selector=field_selector, limit=limit)
+    return await asyncio.to_thread(
+        get_client().query_fleets, label_selector=label_selector, field_selector=field_selector, limit=limit
+    )
 
 
 @mcp.tool()
@@ -226,7 +245,7 @@ async def query_events(field_selector: str = "", limit: int = 1000) -> List[Dict
     Raises:
         RuntimeError: If a network or HTTP error occurs while querying the MCP server.
     """
-    return get_client().query_events(field_selector=field_selector, limit=limit)
+    return await asyncio.to_thread(get_client().query_events, field_selector=field_selector, limit=limit)
 
 
 @mcp.tool()
@@ -290,8 +309,11 @@ async def query_enrollment_requests(
     Raises:
         RuntimeError: If a network or HTTP error occurs while querying the MCP server.
     """
-    return get_client().query_enrollment_requests(
-        label_selector=label_selector, field_selector=field_selector, limit=limit
+    return await asyncio.to_thread(
+        get_client().query_enrollment_requests,
+        label_selector=label_selector,
+        field_selector=field_selector,
+        limit=limit,
     )
 
 
@@ -354,7 +376,9 @@ async def query_repositories(
     Raises:
         RuntimeError: If a network or HTTP error occurs while querying the MCP server.
     """
-    return get_client().query_repositories(label_selector=label_selector, field_selector=field_selector, limit=limit)
+    return await asyncio.to_thread(
+        get_client().query_repositories, label_selector=label_selector, field_selector=field_selector, limit=limit
+    )
 
 
 @mcp.tool()
@@ -417,7 +441,9 @@ async def query_resource_syncs(
     Raises:
         RuntimeError: If a network or HTTP error occurs while querying the MCP server.
     """
-    return get_client().query_resource_syncs(label_selector=label_selector, field_selector=field_selector, limit=limit)
+    return await asyncio.to_thread(
+        get_client().query_resource_syncs, label_selector=label_selector, field_selector=field_selector, limit=limit
+    )
 
 
 @mcp.tool()
@@ -446,31 +472,49 @@ async def run_command_on_device(device_name: str, command: str) -> str:
     Raises:
         RuntimeError: If the CLI is not found or the command fails to execute.
     """
-    return get_client().run_console_command(get_cli().cli_path, device_name, command)
+    cli = await get_cli()
+    return await asyncio.to_thread(get_client().run_console_command, cli.cli_path, device_name, command)
 
 
-if __name__ == "__main__":
-    # Get transport configuration from environment variables
+_Transport = Literal["stdio", "sse", "streamable-http"]
+
+
+def _read_transport_config() -> Tuple[_Transport, str, Optional[int]]:
+    """
+    Read the transport, host and port from MCP_TRANSPORT, MCP_HOST and MCP_PORT.
+    The port is only parsed for HTTP transports and is None for stdio.
+    """
     transport_env = os.environ.get("MCP_TRANSPORT", "stdio")
 
     # Validate transport type
-    if transport_env not in ["stdio", "sse", "streamable-http"]:
-        transport_env = "stdio"
+    transport: _Transport = cast(_Transport, transport_env) if transport_env in get_args(_Transport) else "stdio"
+
+    host = os.environ.get("MCP_HOST", "127.0.0.1")
+    if transport == "stdio":
+        # stdio never binds a port, so a malformed MCP_PORT must not stop it from starting
+        return transport, host, None
 
-    transport: Literal["stdio", "sse", "streamable-http"] = transport_env  # type: ignore
+    port_env = os.environ.get("MCP_PORT", "8000")
+    try:
+        port = int(port_env)
+    except ValueError:
+        raise ValueError(f"MCP_PORT must be an integer port number, got {port_env!r}") from None
+    return transport, host, port
+
+
+if __name__ == "__main__":
+    # Get transport configuration from environment variables
+    transport, host, port = _read_transport_config()
 
     # Run the server with appropriate transport
     if transport == "stdio":
         mcp.run(transport=transport)
     else:
-        # For HTTP-based transports, FastMCP will use environment variables or defaults
-        # Ensure the environment variables are set for FastMCP to pick up
-        if "MCP_HOST" not in os.environ:
-            os.environ["MCP_HOST"] = "127.0.0.1"
-        if "MCP_PORT" not in os.environ:
-            os.environ["MCP_PORT"] = "8000"
-        if "MCP_PATH" not in os.environ:
-            os.environ["MCP_PATH"] = "/mcp"
+        # FastMCP only reads FASTMCP_* variables itself, so apply the MCP_* settings directly
+        mcp.settings.host = host
+        if port is not None:  # Always parsed for HTTP transports
+            mcp.settings.port = port
+        mcp.settings.streamable_http_path = os.environ.get("MCP_PATH", "/mcp")
 
         # Run with HTTP transport
         mcp.run(transport=transport)
@@ -1,15 +1,68 @@
+import functools
 import logging
 import logging.handlers
 import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 import shutil
 import subprocess
+import tempfile
 import os
-import yaml
+import re
+import shlex
+import ssl
+import orjson
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests.utils import DEFAULT_CA_BUNDLE_PATH
+from urllib3.util.retry import Retry
+
+_LOGGER = logging.getLogger(__name__)
+
+# Log records buffered in memory before they are written to the log file
+_LOG_BUFFER_CAPACITY = 256
+
+# Keep-alive pool sizing: a pool per host (API, OIDC), each large enough to hold one connection for every
+# worker thread asyncio.to_thread may run at once (its default executor caps at 32 threads).
+_POOL_CONNECTIONS = 4
+_POOL_MAXSIZE = 32
+
+# Retry transient gateway errors with backoff on the pooled connections. urllib3 only retries
+# idempotent methods by default, so the OIDC token POST is never replayed. Once retries run out
+# the last response is returned, so raise_for_status still reports its status code and body.
+_RETRY = Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504], raise_on_status=False)
+
+# (connect, read) seconds for API and OIDC token requests. Bounds how long a hung endpoint can hold
+# _token_lock during a background refresh, and with it close() at interpreter exit.
+_HTTP_TIMEOUT = (10, 60)
+
+# A Keycloak realm URL ("https://host/realms/<realm>") is completed to its token endpoint
+_OIDC_TOKEN_SUFFIX = "/protocol/openid-connect/token"
+_OIDC_REALM_URL_RE = re.compile(r"(https?://.+/realms/[^/]+)$")
+
+# Environment variables that override client.yaml settings. Plain string overrides are
+# (variable, Configuration attribute, strip trailing slash).
+_ENV_STRING_OVERRIDES = (
+    ("API_BASE_URL", "api_base_url", True),
+    ("OIDC_TOKEN_URL", "oidc_token_url", True),
+    ("OIDC_CLIENT_ID", "client_id", False),
+    ("REFRESH_TOKEN", "refresh_token", False),
+)
+_ENV_KEYS = tuple(key for key, _, _ in _ENV_STRING_OVERRIDES) + ("INSECURE_SKIP_VERIFY", "CA_CERT_PATH")
+
+# Largest page size the Flight Control API accepts for a list request's limit parameter
+_MAX_PAGE_LIMIT = 1000
+
+# Seconds before access token expiry at which a background refresh renews it, so requests
+# keep hitting the cached-token path instead of waiting on the OIDC round-trip
+_TOKEN_REFRESH_LEAD = 120
+
+# Seconds to wait on `flightctl console login` and on a console command before giving up
+_CONSOLE_LOGIN_TIMEOUT = 60
+_CONSOLE_COMMAND_TIMEOUT = 300
 
 
 def setup_logging():
@@ -28,25 +81,133 @@ def setup_logging():
     logger.setLevel(numeric_level)
 
     # Remove any existing handlers to avoid duplicates
-    for handler in logger.handlers[:]:
-        logger.removeHandler(handler)
-
-    # Create rotating file handler (10MB max, keep 5 files)
-    file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=10 * 1024 * 1024, backupCount=5)
+    for handler in logger.handlers:
+        # Closing a MemoryHandler flushes it but leaves its file handler open
+        target = getattr(handler, "target", None)
+        handler.close()
+        if target is not None:
+            target.close()
+    logger.handlers.clear()
+
+    # Create rotating file handler (10MB max, keep 5 files), opened on the first write
+    file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=10 * 1024 * 1024, backupCount=5, delay=True)
     file_handler.setLevel(numeric_level)
 
     # Create formatter
     formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
     file_handler.setFormatter(formatter)
 
+    # Buffer records so chatty INFO/DEBUG logging is written in batches; errors flush immediately.
+    # logging.shutdown() (registered by the logging module at exit) flushes whatever is left.
+    buffered_handler = logging.handlers.MemoryHandler(
+        capacity=_LOG_BUFFER_CAPACITY, flushLevel=logging.ERROR, target=file_handler
+    )
+    buffered_handler.setLevel(numeric_level)
+
     # Add handler to logger
-    logger.addHandler(file_handler)
+    logger.addHandler(buffered_handler)
 
     # Log startup message
     logger.info("FlightCtl MCP Server logging initialized - log file: %s", log_file)
     return logger
 
 
+def _create_ssl_context(verify: Union[bool, str]) -> Optional[ssl.SSLContext]:
+    """
+    Build a verifying SSLContext for the given requests-style verify setting.
+    Returns None when verification is disabled.
+    """
+    if verify is False:
+        return None
+    ca_path = verify if isinstance(verify, str) else DEFAULT_CA_BUNDLE_PATH
+    if os.path.isdir(ca_path):
+        return ssl.create_default_context(capath=ca_path)
+    return ssl.create_default_context(cafile=ca_path)
+
+
+class _SSLContextAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose connections share one pre-built SSLContext instead of reloading CA certs per connection.
+    The shared context is only used while a request's effective verify setting is the one it was built from;
+    any other setting (verify=False, a REQUESTS_CA_BUNDLE/CURL_CA_BUNDLE merged in by requests) gets pools
+    configured the standard way.
+    """
+
+    def __init__(self, ssl_context: ssl.SSLContext, verify: Union[bool, str], **kwargs):
+        self._ssl_context = ssl_context
+        self._verify = verify
+        super().__init__(**kwargs)
+
+    def _uses_shared_context(self, verify) -> bool:
+        return verify is not False and verify == self._verify
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["ssl_context"] = self._ssl_context
+        super().init_poolmanager(*args, **kwargs)
+
+    def proxy_manager_for(self, *args, **kwargs):
+        kwargs["ssl_context"] = self._ssl_context
+        return super().proxy_manager_for(*args, **kwargs)
+
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(request, verify, cert)
+        if self._uses_shared_context(verify):
+            # Trust anchors are already loaded into the shared context
+            pool_kwargs.pop("ca_certs", None)
+            pool_kwargs.pop("ca_cert_dir", None)
+        else:
+            # A None pool kwarg drops the shared context, so these pools load the requested CA bundle
+            pool_kwargs["ssl_context"] = None
+        return host_params, pool_kwargs
+
+    def cert_verify(self, conn, url, verify, cert):
+        super().cert_verify(conn, url, verify, cert)
+        if self._uses_shared_context(verify):
+            conn.ca_certs = None
+            conn.ca_cert_dir = None
+
+
+@functools.lru_cache(maxsize=4)
+def _load_config_file(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """
+    Parse a flightctl client.yaml. Results are memoized per (path, mtime, size) in-process,
+    and persisted to a JSON sidecar so later processes skip YAML parsing (JSON decodes far
+    faster) while the file is unchanged.
+    """
+    config_path = Path(path)
+    key = [mtime_ns, size]
+    cache_path = config_path.with_name(f".{config_path.name}.cache.json")
+
+    try:
+        cached = orjson.loads(cache_path.read_bytes())
+        if cached["key"] == key:
+            _LOGGER.debug("Using cached parse of %s", config_path)
+            return cached["config"]
+    except (OSError, ValueError, TypeError, KeyError):
+        pass
+
+    # PyYAML is imported only on a cache miss; it is the slowest import on the startup path
+    import yaml
+
+    # Prefer the libyaml-backed loader when PyYAML was built with it
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(config_path, "r") as f:
+        config = yaml.load(f.read(), Loader=loader) or {}
+
+    # The config holds the refresh token: mkstemp creates the file owner-only (0600)
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, prefix=cache_path.name, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps({"key": key, "config": config}))
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError) as e:
+        _LOGGER.debug("Could not cache parsed config: %s", e)
+        if tmp_path and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+    return config
+
+
 class FlightControlError(Exception):
     """Base exception for Flight Control API errors."""
 
@@ -72,7 +233,7 @@ class Configuration:
     """Configuration manager that reads from flightctl config and environment variables."""
 
     def __init__(self):
-        self.logger = logging.getLogger(__name__)
+        self.logger = _LOGGER
         self.config_path = Path.home() / ".config" / "flightctl" / "client.yaml"
         self.certs_path = Path.home() / ".config" / "flightctl" / "certs"
         self._load_config()
@@ -92,8 +253,7 @@ class Configuration:
         # Try to read from flightctl config file
         if self.config_path.exists():
             try:
-                with open(self.config_path, "r") as f:
-                    config = yaml.safe_load(f)
+                config = self._read_config_file()
 
                 # Extract service configuration
                 service_config = config.get("service", {})
@@ -121,24 +281,17 @@ class Configuration:
         else:
             self.logger.info("No flightctl config file found at %s", self.config_path)
 
-        # Environment variable overrides (higher priority)
-        if os.environ.get("API_BASE_URL"):
-            self.api_base_url = os.environ["API_BASE_URL"].rstrip("/")
-            self.logger.debug("API_BASE_URL overridden by environment variable")
-        if os.environ.get("OIDC_TOKEN_URL"):
-            self.oidc_token_url = os.environ["OIDC_TOKEN_URL"].rstrip("/")
-            self.logger.debug("OIDC_TOKEN_URL overridden by environment variable")
-        if os.environ.get("OIDC_CLIENT_ID"):
-            self.client_id = os.environ["OIDC_CLIENT_ID"]
-            self.logger.debug("OIDC_CLIENT_ID overridden by environment variable")
-        if os.environ.get("REFRESH_TOKEN"):
-            self.refresh_token = os.environ["REFRESH_TOKEN"]
-            self.logger.debug("REFRESH_TOKEN overridden by environment variable")
-        if os.environ.get("INSECURE_SKIP_VERIFY"):
-            self.insecure_skip_verify = os.environ["INSECURE_SKIP_VERIFY"].lower() in ("true", "1", "yes")
+        # Environment variable overrides (higher priority); unset and empty variables are ignored
+        env = {key: os.environ[key] for key in _ENV_KEYS if os.environ.get(key)}
+        for key, attr, strip_slash in _ENV_STRING_OVERRIDES:
+            if key in env:
+                setattr(self, attr, env[key].rstrip("/") if strip_slash else env[key])
+                self.logger.debug("%s overridden by environment variable", key)
+        if "INSECURE_SKIP_VERIFY" in env:
+            self.insecure_skip_verify = env["INSECURE_SKIP_VERIFY"].lower() in ("true", "1", "yes")
             self.logger.debug("INSECURE_SKIP_VERIFY overridden by environment variable: %s", self.insecure_skip_verify)
-        if os.environ.get("CA_CERT_PATH"):
-            ca_path = Path(os.environ["CA_CERT_PATH"])
+        if "CA_CERT_PATH" in env:
+            ca_path = Path(env["CA_CERT_PATH"])
             if ca_path.exists():
                 self.ca_cert_path = str(ca_path)
                 self.logger.debug("CA_CERT_PATH overridden by environment variable: %s", self.ca_cert_path)
@@ -146,16 +299,19 @@ class Configuration:
                 self.logger.warning("CA_CERT_PATH points to non-existent file: %s", ca_path)
 
         # Auto-fix OIDC URL format if needed
-        if self.oidc_token_url and not self.oidc_token_url.endswith("/protocol/openid-connect/token"):
-            import re
-
-            match = re.match(r"(https?://.+/realms/[^/]+)$", self.oidc_token_url)
+        if self.oidc_token_url and not self.oidc_token_url.endswith(_OIDC_TOKEN_SUFFIX):
+            match = _OIDC_REALM_URL_RE.match(self.oidc_token_url)
             if match:
-                self.oidc_token_url = match.group(1) + "/protocol/openid-connect/token"
+                self.oidc_token_url = match.group(1) + _OIDC_TOKEN_SUFFIX
                 self.logger.debug("Auto-corrected OIDC token URL to: %s", self.oidc_token_url)
 
         self.logger.info("Configuration loaded - API: %s, Skip SSL: %s", self.api_base_url, self.insecure_skip_verify)
 
+    def _read_config_file(self) -> Dict[str, Any]:
+        """Return the parsed client.yaml; unchanged files are served from cache."""
+        st = self.config_path.stat()
+        return _load_config_file(str(self.config_path), st.st_mtime_ns, st.st_size)
+
     def get_ssl_verify(self):
         """Get SSL verification setting for requests."""
         if self.insecure_skip_verify:
@@ -168,7 +324,7 @@ class Configuration:
 
 class FlightControlClient:
     def __init__(self, config: Optional[Configuration] = None):
-        self.logger = logging.getLogger(__name__)
+        self.logger = _LOGGER
         self.config = config or Configuration()
 
         # Validate required configuration
@@ -181,10 +337,44 @@ class FlightControlClient:
 
         self._token_lock = threading.Lock()
         self._access_token = None
-        self._token_expiry = 0  # Epoch seconds
+        self._token_expiry = 0.0  # time.monotonic() seconds
+        self._refresh_timer: Optional[threading.Timer] = None
+        self._closed = False
+        self._auth_headers: Optional[Tuple[str, Dict[str, str]]] = None  # (token, headers) cache
+        self._resource_url_prefix = f"{self.config.api_base_url}/api/v1/"
+        # (cli_path, access_token, insecure) of the last successful `flightctl console login`
+        self._cli_login_state: Optional[Tuple[str, str, bool]] = None
+        self._cli_login_expiry = 0.0  # time.monotonic() seconds
+        self._flightctl_on_path = False
+        self._inflight: Dict[Tuple[Any, ...], Future] = {}  # Single-flight registry for _query_resources
+        self._inflight_lock = threading.Lock()
+
+        # Shared keep-alive session so paginated queries reuse one TLS connection per host
+        self._session = requests.Session()
+        self._session.verify = self.config.get_ssl_verify()
+        # Sessions already advertise "Accept-Encoding: gzip, deflate" and decompress transparently
+        self._session.headers["Accept"] = "application/json"
+        pool_kwargs: Dict[str, Any] = dict(
+            pool_connections=_POOL_CONNECTIONS, pool_maxsize=_POOL_MAXSIZE, max_retries=_RETRY
+        )
+        self._session.mount("http://", HTTPAdapter(**pool_kwargs))
+        ssl_context = _create_ssl_context(self._session.verify)
+        if ssl_context is not None:
+            self._session.mount("https://", _SSLContextAdapter(ssl_context, self._session.verify, **pool_kwargs))
+        else:
+            self._session.mount("https://", HTTPAdapter(**pool_kwargs))
 
         self.logger.info("FlightControl client initialized for API: %s", self.config.api_base_url)
 
+    def close(self) -> None:
+        """Stop background token refreshes and close pooled HTTP connections held by this client."""
+        with self._token_lock:
+            self._closed = True
+            if self._refresh_timer is not None:
+                self._refresh_timer.cancel()
+                self._refresh_timer = None
+        self._session.close()
+
     def query_devices(
         self,
         *,
@@ -267,9 +457,91 @@ class FlightControlClient:
             limit=limit,
         )
 
+    def iter_resources(
+        self,
+        resource: str,
+        *,
+        label_selector: Optional[str] = None,
+        field_selector: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yields resources page by page as they arrive, following continue tokens.
+        Callers that filter or count can consume this without holding every page in memory.
+        Args:
+            resource: The API collection to list (e.g. "devices", "fleets").
+            label_selector: Optional label selector string.
+            field_selector: Optional field selector string.
+            limit: Maximum number of items to yield.
+        Raises:
+            AuthenticationError: If an access token cannot be obtained or is rejected.
+            APIError: On HTTP, network, or response decoding failures.
+        """
+        url = self._resource_url_prefix + resource
+        count = 0
+
+        self.logger.debug(
+            "Querying %s with label_selector=%s, field_selector=%s, limit=%s",
+            resource,
+            label_selector,
+            field_selector,
+            limit,
+        )
+
+        try:
+            headers = self._get_auth_headers()
+        except AuthenticationError:
+            self.logger.error("Authentication failed for %s query", resource)
+            raise
+
+        # Pages are chained by continue tokens, so they cannot be fetched in parallel. Instead, as soon
+        # as page N's token is known, page N+1 is requested on a worker thread while page N is consumed.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            page_count = 1
+            # Selectors are fixed for the whole query; only continue and limit vary per page
+            base_params = {}
+            if label_selector:
+                base_params["labelSelector"] = label_selector
+            if field_selector:
+                base_params["fieldSelector"] = field_selector
+            params = self._page_params(base_params, None, limit)
+            data = self._fetch_page(resource, url, headers, params, page_count)
+            while True:
+                page_items = data.get("items") or []
+                page_size = len(page_items)
+                continue_token = data.get("continue")
+                remaining = limit - count if limit else None
+                reached_limit = remaining is not None and page_size >= remaining
+
+                next_page: Optional[Future] = None
+                if continue_token and not reached_limit:
+                    next_limit = remaining - page_size if remaining is not None else None
+                    params = self._page_params(base_params, continue_token, next_limit)
+                    next_page = executor.submit(self._fetch_page, resource, url, headers, params, page_count + 1)
+
+                self.logger.debug("Fetched %d items from page %d of %s", page_size, page_count, resource)
+
+                if reached_limit:
+                    yield from page_items[:remaining]
+                    self.logger.info("Successfully queried %s: %d items (limited to %d)", resource, limit, limit)
+                    return
+
+                yield from page_items
+                count += page_size
+
+                if next_page is None:
+                    break
+                page_count += 1
+                data = next_page.result()
+
+        self.logger.info("Successfully queried %s: %d items total", resource, count)
+
     def run_console_command(self, cli_path: str, device_name: str, command: str) -> str:
         """
         Runs a console command on a device using the installed flightctl CLI.
+        The device console is an interactive WebSocket stream rather than a plain REST
+        endpoint, so the session protocol is left to the CLI instead of being
+        reimplemented over the shared HTTP session.
         Args:
             cli_path: The path to the flightctl CLI binary.
             device_name: The name of the target device.
@@ -281,7 +553,10 @@ class FlightControlClient:
         """
         self.logger.info("Running console command on device '%s': %s", device_name, command)
 
-        if not shutil.which("flightctl"):
+        if not self._flightctl_on_path:
+            # Only a hit is remembered: FlightctlCLI may add its install dir to PATH later
+            self._flightctl_on_path = shutil.which("flightctl") is not None
+        if not self._flightctl_on_path:
             self.logger.error("flightctl CLI not found in PATH")
             raise FlightControlError("flightctl CLI not found. Please ensure it's installed and in PATH.")
 
@@ -290,6 +565,11 @@ class FlightControlClient:
             raise FlightControlError("Device name cannot be empty")
         if not command or not command.strip():
             raise FlightControlError("Command cannot be empty")
+        try:
+            # Honor shell-style quoting, e.g. grep "two words" /var/log/messages
+            command_args = shlex.split(command)
+        except ValueError as e:
+            raise FlightControlError(f"Invalid command syntax: {e}")
 
         try:
             # Get access token for authentication
@@ -298,47 +578,62 @@ class FlightControlClient:
             self.logger.error("Failed to get access token for console command: %s", e)
             raise
 
-        # Login with the CLI
-        login_cmd = [
-            cli_path,
-            "console",
-            "login",
-            "--insecure-skip-tls-verify" if self.config.insecure_skip_verify else "",
-            "--token",
-            access_token,
-        ]
-        # Remove empty strings from the command
-        login_cmd = [arg for arg in login_cmd if arg]
-
-        self.logger.debug("Logging in to flightctl console")
-        try:
-            result = subprocess.run(login_cmd, check=True, capture_output=True, text=True)
-            self.logger.debug("Console login successful")
-        except subprocess.CalledProcessError as e:
-            self.logger.error("Console login failed: %s", e.stderr)
-            raise FlightControlError(f"Failed to login to flightctl console: {e.stderr}")
+        # Login with the CLI, unless it is still logged in with this same access token
+        login_state = (cli_path, access_token, self.config.insecure_skip_verify)
+        if login_state == self._cli_login_state and time.monotonic() < self._cli_login_expiry:
+            self.logger.debug("Reusing existing flightctl console login")
+        else:
+            login_cmd = [cli_path, "console", "login"]
+            if self.config.insecure_skip_verify:
+                login_cmd.append("--insecure-skip-tls-verify")
+            login_cmd += ["--token", access_token]
+
+            self.logger.debug("Logging in to flightctl console")
+            try:
+                subprocess.run(login_cmd, check=True, capture_output=True, text=True, timeout=_CONSOLE_LOGIN_TIMEOUT)
+                self.logger.debug("Console login successful")
+            except subprocess.CalledProcessError as e:
+                self.logger.error("Console login failed: %s", e.stderr)
+                raise FlightControlError(f"Failed to login to flightctl console: {e.stderr}")
+            except subprocess.TimeoutExpired:
+                self.logger.error("Console login timed out after %d seconds", _CONSOLE_LOGIN_TIMEOUT)
+                raise FlightControlError(f"flightctl console login timed out after {_CONSOLE_LOGIN_TIMEOUT} seconds")
+            self._cli_login_state = login_state
+            self._cli_login_expiry = self._token_expiry - 60
 
         # Execute the command
-        cmd = [
-            cli_path,
-            "console",
-            f"device/{device_name}",
-            "--insecure-skip-tls-verify" if self.config.insecure_skip_verify else "",
-            "--",
-        ] + command.split()
-        # Remove empty strings from the command
-        cmd = [arg for arg in cmd if arg]
-
-        self.logger.debug("Executing console command: %s", " ".join(cmd[: -len(command.split())]))
+        cmd = [cli_path, "console", f"device/{device_name}"]
+        if self.config.insecure_skip_verify:
+            cmd.append("--insecure-skip-tls-verify")
+        cmd.append("--")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Executing console command: %s", " ".join(cmd))
+        cmd += command_args
         try:
-            result = subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            result = subprocess.run(
+                cmd,
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=_CONSOLE_COMMAND_TIMEOUT,
+            )
             self.logger.info("Console command completed successfully on device '%s'", device_name)
             return result.stdout.strip()
         except subprocess.CalledProcessError as e:
             self.logger.error(
                 "Console command failed on device '%s': exit code %d, stderr: %s", device_name, e.returncode, e.stderr
             )
+            # The failure may be a rejected CLI session; log in again on the next call
+            self._cli_login_state = None
             raise FlightControlError(f"Console command failed on device '{device_name}': {e.stderr}")
+        except subprocess.TimeoutExpired:
+            self.logger.error(
+                "Console command on device '%s' timed out after %d seconds", device_name, _CONSOLE_COMMAND_TIMEOUT
+            )
+            raise FlightControlError(
+                f"Console command on device '{device_name}' timed out after {_CONSOLE_COMMAND_TIMEOUT} seconds"
+            )
         except Exception as e:
             self.logger.error("Unexpected error running console command on device '%s': %s", device_name, e)
             raise FlightControlError(f"Unexpected error running console command: {e}")
@@ -346,47 +641,89 @@ class FlightControlClient:
     # --- Internal Methods ---
 
     def _get_access_token(self) -> str:
+        # Lock-free fast path. The refresh stores the token before its expiry, so reading the
+        # expiry first guarantees a fresh expiry is never paired with a stale token.
+        expiry = self._token_expiry
+        token = self._access_token
+        if token and time.monotonic() < expiry - 60:
+            return token
+
         with self._token_lock:
-            now = time.time()
-            if self._access_token and now < self._token_expiry - 60:
+            # Another thread may have refreshed while we waited for the lock
+            if self._access_token and time.monotonic() < self._token_expiry - 60:
                 self.logger.debug("Using cached access token")
-                assert self._access_token is not None
                 return self._access_token
+            return self._refresh_access_token()
 
-            self.logger.debug("Refreshing OIDC access token")
-            try:
-                resp = requests.post(
-                    f"{self.config.oidc_token_url}",
-                    data={
-                        "grant_type": "refresh_token",
-                        "refresh_token": self.config.refresh_token,
-                        "client_id": self.config.client_id,
-                    },
-                    headers={"Content-Type": "application/x-www-form-urlencoded"},
-                    verify=self.config.get_ssl_verify(),
-                )
-                resp.raise_for_status()
-                data = resp.json()
-                access_token = data["access_token"]
-                if not access_token or not isinstance(access_token, str):
-                    raise AuthenticationError("Invalid access token received from OIDC provider")
-                self._access_token = access_token
-                self._token_expiry = now + data.get("expires_in", 3600)
-                self.logger.info("Successfully refreshed OIDC access token")
-                return access_token
-            except requests.exceptions.RequestException as e:
-                self.logger.error("Failed to refresh OIDC token - network error: %s", e)
-                if hasattr(e, "response") and e.response is not None:
-                    self.logger.error("Response status: %s, body: %s", e.response.status_code, e.response.text)
-                    raise AuthenticationError(f"Failed to refresh OIDC token: HTTP {e.response.status_code}")
-                else:
-                    raise AuthenticationError(f"Failed to refresh OIDC token: {e}")
-            except KeyError as e:
-                self.logger.error("Invalid OIDC token response - missing field: %s", e)
-                raise AuthenticationError(f"Invalid OIDC token response: missing {e}")
-            except Exception as e:
-                self.logger.error("Unexpected error during token refresh: %s", e)
+    def _refresh_access_token(self) -> str:
+        """Exchanges the refresh token for a new access token. Callers must hold _token_lock."""
+        now = time.monotonic()
+        self.logger.debug("Refreshing OIDC access token")
+        try:
+            resp = self._session.post(
+                self.config.oidc_token_url,
+                data={
+                    "grant_type": "refresh_token",
+                    "refresh_token": self.config.refresh_token,
+                    "client_id": self.config.client_id,
+                },
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                # Explicit, so REQUESTS_CA_BUNDLE/CURL_CA_BUNDLE cannot override the configured setting
+                verify=self._session.verify,
+                timeout=_HTTP_TIMEOUT,
+            )
+            resp.raise_for_status()
+            data = orjson.loads(resp.content)
+            access_token = data["access_token"]
+            if not access_token or not isinstance(access_token, str):
+                raise AuthenticationError("Invalid access token received from OIDC provider")
+            self._access_token = access_token
+            expires_in = data.get("expires_in", 3600)
+            self._token_expiry = now + expires_in
+            self.logger.info("Successfully refreshed OIDC access token")
+            self._schedule_token_refresh(expires_in)
+            return access_token
+        except requests.exceptions.RequestException as e:
+            self.logger.error("Failed to refresh OIDC token - network error: %s", e)
+            if hasattr(e, "response") and e.response is not None:
+                self.logger.error("Response status: %s, body: %s", e.response.status_code, e.response.text)
+                raise AuthenticationError(f"Failed to refresh OIDC token: HTTP {e.response.status_code}")
+            else:
                 raise AuthenticationError(f"Failed to refresh OIDC token: {e}")
+        except KeyError as e:
+            self.logger.error("Invalid OIDC token response - missing field: %s", e)
+            raise AuthenticationError(f"Invalid OIDC token response: missing {e}")
+        except Exception as e:
+            self.logger.error("Unexpected error during token refresh: %s", e)
+            raise AuthenticationError(f"Failed to refresh OIDC token: {e}")
+
+    def _schedule_token_refresh(self, expires_in: float) -> None:
+        """Arms a daemon timer that renews the token shortly before it expires, off the request path."""
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+        delay = expires_in - _TOKEN_REFRESH_LEAD
+        if self._closed or delay <= 0:
+            return  # Short-lived tokens are left to the synchronous refresh
+        self._refresh_timer = threading.Timer(delay, self._background_token_refresh)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def _background_token_refresh(self) -> None:
+        try:
+            with self._token_lock:
+                self._refresh_access_token()
+        except AuthenticationError as e:
+            # The next request falls back to refreshing synchronously
+            self.logger.warning("Background OIDC token refresh failed: %s", e)
+
+    def _get_auth_headers(self) -> Dict[str, str]:
+        """Returns request headers for the current access token, rebuilt only when the token changes."""
+        token = self._get_access_token()
+        cached = self._auth_headers
+        if cached is None or cached[0] != token:
+            cached = self._auth_headers = (token, {"Authorization": f"Bearer {token}"})
+        return cached[1]
 
     def _query_resources(
         self,
@@ -396,78 +733,76 @@ class FlightControlClient:
         field_selector: Optional[str] = None,
         limit: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
-        url = f"{self.config.api_base_url}/api/v1/{resource}"
-        items: List[Dict[str, Any]] = []
-        continue_token: Optional[str] = None
-
-        self.logger.debug(
-            "Querying %s with label_selector=%s, field_selector=%s, limit=%s",
-            resource,
-            label_selector,
-            field_selector,
-            limit,
-        )
+        # Single-flight: identical queries issued while one is in progress wait for and share its result
+        key = (resource, label_selector, field_selector, limit)
+        with self._inflight_lock:
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                future: Future = Future()
+                self._inflight[key] = future
+        if inflight is not None:
+            self.logger.debug("Joining in-flight query for %s", resource)
+            return list(inflight.result())
 
         try:
-            headers = {"Authorization": f"Bearer {self._get_access_token()}"}
-        except AuthenticationError:
-            self.logger.error("Authentication failed for %s query", resource)
+            items = list(
+                self.iter_resources(resource, label_selector=label_selector, field_selector=field_selector, limit=limit)
+            )
+        except BaseException as e:
+            future.set_exception(e)
             raise
+        else:
+            future.set_result(items)
+            return items
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    @staticmethod
+    def _page_params(
+        base_params: Dict[str, str], continue_token: Optional[str], remaining: Optional[int]
+    ) -> Dict[str, str]:
+        # A fresh dict per page: the previous page's params may still be in use by the prefetch thread
+        params = base_params.copy()
+        if continue_token:
+            params["continue"] = continue_token
+        if remaining:
+            # Ask the server for no more than the caller still needs
+            params["limit"] = str(min(remaining, _MAX_PAGE_LIMIT))
+        return params
+
+    def _fetch_page(
+        self, resource: str, url: str, headers: Dict[str, str], params: Dict[str, str], page_count: int
+    ) -> Dict[str, Any]:
+        self.logger.debug("Fetching page %d for %s", page_count, resource)
 
-        page_count = 0
-        while True:
-            page_count += 1
-            params = {}
-            if label_selector:
-                params["labelSelector"] = label_selector
-            if field_selector:
-                params["fieldSelector"] = field_selector
-            if continue_token:
-                params["continue"] = continue_token
-
-            self.logger.debug("Fetching page %d for %s", page_count, resource)
-
-            try:
-                resp = requests.get(url, headers=headers, params=params, verify=self.config.get_ssl_verify())
-                resp.raise_for_status()
-                data = resp.json()
-            except requests.exceptions.HTTPError as e:
-                self.logger.error("HTTP error querying %s: %s %s", resource, e.response.status_code, e.response.reason)
-                if e.response.status_code == 401:
-                    raise AuthenticationError(f"Authentication failed for {resource} query: {e}")
-                elif e.response.status_code == 403:
-                    raise APIError(f"Access denied for {resource} query: {e}", e.response.status_code)
-                elif e.response.status_code == 404:
-                    raise APIError(f"Resource not found: {resource}", e.response.status_code)
-                else:
-                    raise APIError(
-                        f"Failed to query {resource}: HTTP {e.response.status_code}",
-                        e.response.status_code,
-                        e.response.text,
-                    )
-            except requests.exceptions.RequestException as e:
-                self.logger.error("Network error querying %s: %s", resource, e)
-                raise APIError(f"Network error querying {resource}: {e}")
-            except ValueError as e:
-                self.logger.error("Invalid JSON response from %s: %s", resource, e)
-                raise APIError(f"Invalid JSON response from {resource}: {e}")
-            except Exception as e:
-                self.logger.error("Unexpected error querying %s: %s", resource, e)
-                raise APIError(f"Unexpected error querying {resource}: {e}")
-
-            page_items = data.get("items", [])
-            items.extend(page_items)
-
-            self.logger.debug("Fetched %d items from page %d of %s", len(page_items), page_count, resource)
-
-            if limit and len(items) >= limit:
-                result = items[:limit]
-                self.logger.info("Successfully queried %s: %d items (limited to %d)", resource, len(result), limit)
-                return result
-
-            continue_token = data.get("continue")
-            if not continue_token:
-                break
-
-        self.logger.info("Successfully queried %s: %d items total", resource, len(items))
-        return items
+        try:
+            # Explicit, so REQUESTS_CA_BUNDLE/CURL_CA_BUNDLE cannot override the configured setting
+            resp = self._session.get(
+                url, headers=headers, params=params, verify=self._session.verify, timeout=_HTTP_TIMEOUT
+            )
+            resp.raise_for_status()
+            return orjson.loads(resp.content)
+        except requests.exceptions.HTTPError as e:
+            self.logger.error("HTTP error querying %s: %s %s", resource, e.response.status_code, e.response.reason)
+            if e.response.status_code == 401:
+                raise AuthenticationError(f"Authentication failed for {resource} query: {e}")
+            elif e.response.status_code == 403:
+                raise APIError(f"Access denied for {resource} query: {e}", e.response.status_code)
+            elif e.response.status_code == 404:
+                raise APIError(f"Resource not found: {resource}", e.response.status_code)
+            else:
+                raise APIError(
+                    f"Failed to query {resource}: HTTP {e.response.status_code}",
+                    e.response.status_code,
+                    e.response.text,
+                )
+        except requests.exceptions.RequestException as e:
+            self.logger.error("Network error querying %s: %s", resource, e)
+            raise APIError(f"Network error querying {resource}: {e}")
+        except ValueError as e:
+            self.logger.error("Invalid JSON response from %s: %s", resource, e)
+            raise APIError(f"Invalid JSON response from {resource}: {e}")
+        except Exception as e:
+            self.logger.error("Unexpected error querying %s: %s", resource, e)
+            raise APIError(f"Unexpected error querying {resource}: {e}")
@@ -8,12 +8,21 @@ This test suite includes:
 3. Live tests - Test against real Flight Control instance (optional)
 """
 
+import io
+import json
+import logging
 import os
 import pytest
-import tempfile
+import requests
+import subprocess
+import tarfile
+import threading
+import time
+import urllib3
 import yaml
+from contextlib import nullcontext
 from pathlib import Path
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 
 from resource_queries import (
     Configuration,
@@ -22,9 +31,16 @@ from resource_queries import (
     AuthenticationError,
     APIError,
     setup_logging,
+    _HTTP_TIMEOUT,
+    _load_config_file,
 )
 from cli import FlightctlCLI
 
+# Write YAML fixtures with the libyaml emitter when available, mirroring the CSafeLoader used to read them
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+DEVICES_URL = "https://api.test.com/api/v1/devices"
+
 
 class TestConfiguration:
     """Test Configuration class functionality."""
@@ -59,66 +75,76 @@ class TestConfiguration:
                 assert config.refresh_token == "test-token"
                 assert config.insecure_skip_verify is True
 
-    def test_config_file_parsing(self):
+    def test_config_file_parsing(self, parsed_client_yaml):
         """Test parsing of flightctl client.yaml configuration."""
-        config_data = {
-            "service": {"server": "https://api.flightctl.example.com", "insecureSkipVerify": True},
-            "authentication": {
-                "auth-provider": {
-                    "config": {
-                        "server": "https://auth.flightctl.example.com/realms/flightctl",
-                        "client-id": "flightctl",
-                        "refresh-token": "eyJ...",
-                    }
-                }
-            },
-        }
-
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            config_path = f.name
-
-        try:
-            with patch.object(Configuration, "__init__", lambda self: None):
-                config = Configuration()
-                config.logger = Mock()
-                config.config_path = Path(config_path)
-                config.certs_path = Path("/tmp/certs")
-                config._load_config()
-
-                assert config.api_base_url == "https://api.flightctl.example.com"
-                assert config.insecure_skip_verify is True
-                assert (
-                    config.oidc_token_url
-                    == "https://auth.flightctl.example.com/realms/flightctl/protocol/openid-connect/token"
-                )
-                assert config.client_id == "flightctl"
-                assert config.refresh_token == "eyJ..."
-        finally:
-            os.unlink(config_path)
-
-    def test_ssl_verify_settings(self):
+        with patch.object(Configuration, "__init__", lambda self: None):
+            config = Configuration()
+            config.logger = Mock()
+            config.config_path = parsed_client_yaml
+            config.certs_path = Path("/tmp/certs")
+            config._load_config()
+
+            assert config.api_base_url == "https://api.flightctl.example.com"
+            assert config.insecure_skip_verify is True
+            assert (
+                config.oidc_token_url
+                == "https://auth.flightctl.example.com/realms/flightctl/protocol/openid-connect/token"
+            )
+            assert config.client_id == "flightctl"
+            assert config.refresh_token == "eyJ..."
+
+    def test_config_file_cache(self, tmp_path):
+        """Test that client.yaml is re-parsed only when it changes."""
+        config_path = tmp_path / "client.yaml"
+        config_path.write_text(yaml.dump({"service": {"server": "https://api.one.example.com"}}, Dumper=_YAML_DUMPER))
+
+        with patch.object(Configuration, "__init__", lambda self: None):
+            config = Configuration()
+            config.logger = Mock()
+            config.config_path = config_path
+
+            assert config._read_config_file()["service"]["server"] == "https://api.one.example.com"
+            cache_path = tmp_path / ".client.yaml.cache.json"
+            assert cache_path.stat().st_mode & 0o777 == 0o600
+
+            # Served from the in-process cache, then from the JSON sidecar in a "new process"
+            with patch("yaml.load") as mock_load:
+                assert config._read_config_file()["service"]["server"] == "https://api.one.example.com"
+                _load_config_file.cache_clear()
+                assert config._read_config_file()["service"]["server"] == "https://api.one.example.com"
+            mock_load.assert_not_called()
+
+            config_path.write_text(
+                yaml.dump({"service": {"server": "https://api.second.example.com"}}, Dumper=_YAML_DUMPER)
+            )
+            assert config._read_config_file()["service"]["server"] == "https://api.second.example.com"
+
+    @pytest.fixture(scope="module")
+    def bare_config(self):
+        """A Configuration that skips loading client.yaml and the environment."""
+        with patch.object(Configuration, "__init__", lambda self: None):
+            return Configuration()
+
+    @pytest.mark.parametrize(
+        "insecure_skip_verify,ca_cert_path,expected",
+        [
+            (True, None, False),  # Insecure skip verify
+            (False, "/path/to/ca.pem", "/path/to/ca.pem"),  # Custom CA certificate
+            (False, None, True),  # System CA bundle
+        ],
+    )
+    def test_ssl_verify_settings(self, bare_config, insecure_skip_verify, ca_cert_path, expected):
         """Test SSL verification configuration."""
-        config = Configuration()
-
-        # Test insecure skip verify
-        config.insecure_skip_verify = True
-        assert config.get_ssl_verify() is False
-
-        # Test custom CA certificate
-        config.insecure_skip_verify = False
-        config.ca_cert_path = "/path/to/ca.pem"
-        assert config.get_ssl_verify() == "/path/to/ca.pem"
-
-        # Test system CA bundle
-        config.ca_cert_path = None
-        assert config.get_ssl_verify() is True
+        bare_config.insecure_skip_verify = insecure_skip_verify
+        bare_config.ca_cert_path = ca_cert_path
+        assert bare_config.get_ssl_verify() == expected
+        assert type(bare_config.get_ssl_verify()) is type(expected)
 
 
 class TestFlightControlClient:
     """Test FlightControlClient functionality."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_config(self):
         """Create a mock configuration for testing."""
         config = Mock()
@@ -130,19 +156,30 @@ class TestFlightControlClient:
         config.get_ssl_verify.return_value = True
         return config
 
+    @pytest.fixture(scope="module")
+    def shared_client(self, mock_config):
+        """Create one FlightControlClient per module; building its SSLContext dominates client setup."""
+        client = FlightControlClient(mock_config)
+        yield client
+        client.close()
+
     @pytest.fixture
-    def client(self, mock_config):
-        """Create a FlightControlClient with mock configuration."""
-        with patch("resource_queries.logging.getLogger"):
-            return FlightControlClient(mock_config)
+    def client(self, shared_client):
+        """
+        Lend the shared client to a test and restore its attributes afterwards.
+        The restore is shallow: tests that close or tear down the client must build their own.
+        """
+        saved = dict(vars(shared_client))
+        yield shared_client
+        vars(shared_client).clear()
+        vars(shared_client).update(saved)
 
     def test_client_initialization_success(self, mock_config):
         """Test successful client initialization."""
-        with patch("resource_queries.logging.getLogger"):
-            client = FlightControlClient(mock_config)
-            assert client.config == mock_config
-            assert client._access_token is None
-            assert client._token_expiry == 0
+        client = FlightControlClient(mock_config)
+        assert client.config == mock_config
+        assert client._access_token is None
+        assert client._token_expiry == 0
 
     def test_client_initialization_missing_config(self):
         """Test client initialization with missing configuration."""
@@ -151,49 +188,162 @@ class TestFlightControlClient:
         config.oidc_token_url = "https://auth.test.com/token"
         config.refresh_token = "token"
 
-        with patch("resource_queries.logging.getLogger"):
-            with pytest.raises(FlightControlError, match="API_BASE_URL not configured"):
-                FlightControlClient(config)
+        with pytest.raises(FlightControlError, match="API_BASE_URL not configured"):
+            FlightControlClient(config)
+
+    def test_session_shares_ssl_context(self, client):
+        """Test that HTTPS connections reuse the client's SSLContext rather than reloading CA certs."""
+        adapter = client._session.get_adapter("https://api.test.com")
+        conn = Mock()
+        adapter.cert_verify(conn, "https://api.test.com", True, None)
+
+        assert adapter.poolmanager.connection_pool_kw["ssl_context"] is adapter._ssl_context
+        assert conn.cert_reqs == "CERT_REQUIRED"
+        assert conn.ca_certs is None
+
+    def test_session_honours_env_ca_bundle(self, client, monkeypatch, tmp_path):
+        """Test that a REQUESTS_CA_BUNDLE merged in by requests bypasses the shared SSLContext."""
+        bundle = str(tmp_path / "ca.pem")
+        Path(bundle).write_text("")
+        monkeypatch.setenv("REQUESTS_CA_BUNDLE", bundle)
+        verify = client._session.merge_environment_settings(DEVICES_URL, {}, None, None, None)["verify"]
+        adapter = client._session.get_adapter(DEVICES_URL)
+        request = requests.Request("GET", DEVICES_URL).prepare()
+
+        _, pool_kwargs = adapter.build_connection_pool_key_attributes(request, verify)
+        conn = Mock()
+        adapter.cert_verify(conn, DEVICES_URL, verify, None)
+
+        assert verify == bundle
+        assert pool_kwargs["ssl_context"] is None
+        assert pool_kwargs["ca_certs"] == bundle
+        assert conn.ca_certs == bundle
+
+    @pytest.mark.parametrize("configured", [False, requests.certs.where()], ids=["insecure", "ca-path"])
+    def test_configured_verify_beats_env_ca_bundle(self, mock_config, requests_mock, monkeypatch, configured):
+        """Test that INSECURE_SKIP_VERIFY or CA_CERT_PATH wins over REQUESTS_CA_BUNDLE on token and API requests."""
+        monkeypatch.setenv("REQUESTS_CA_BUNDLE", "/etc/ssl/certs/env-bundle.pem")
+        config = Mock(
+            api_base_url=mock_config.api_base_url,
+            oidc_token_url=mock_config.oidc_token_url,
+            client_id=mock_config.client_id,
+            refresh_token=mock_config.refresh_token,
+        )
+        config.get_ssl_verify.return_value = configured
+        client = FlightControlClient(config)
+        requests_mock.post(config.oidc_token_url, json={"access_token": "token", "expires_in": 3600})
+        requests_mock.get(DEVICES_URL, json={"items": []})
+
+        with patch("resource_queries.threading.Timer"):
+            client.query_devices()
+        client.close()
+
+        assert [request.verify for request in requests_mock.request_history] == [configured, configured]
+
+    def test_session_requests_compressed_json(self, client):
+        """Test that API requests advertise compression and JSON alongside the auth header."""
+        request = requests.Request("GET", "https://api.test.com/api/v1/devices", headers={"Authorization": "Bearer t"})
+        prepared = client._session.prepare_request(request)
+
+        assert "gzip" in prepared.headers["Accept-Encoding"]
+        assert prepared.headers["Accept"] == "application/json"
+        assert prepared.headers["Authorization"] == "Bearer t"
+
+    def test_session_retries_gateway_errors(self, client, monkeypatch):
+        """Test that a persistent 503 is retried on the pooled connection, then reported with its status and body."""
+        sent = []
+
+        def respond(pool, conn, method, url, **kwargs):
+            sent.append(method)
+            body = io.BytesIO(b"service unavailable")
+            return urllib3.HTTPResponse(body=body, status=503, preload_content=False, request_method=method)
+
+        monkeypatch.setattr(urllib3.connectionpool.HTTPConnectionPool, "_make_request", respond)
+        monkeypatch.setattr(urllib3.util.retry.Retry, "sleep", lambda retry, response=None: None)
+
+        with patch.object(client, "_get_access_token", return_value="test-token"):
+            with pytest.raises(APIError) as exc_info:
+                client.query_devices()
 
-    @patch("resource_queries.requests.post")
-    def test_token_refresh_success(self, mock_post, client):
+        assert sent == ["GET"] * 4
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.response_text == "service unavailable"
+        assert not client._session.get_adapter(DEVICES_URL).max_retries.is_retry("POST", 503)
+
+    def test_token_refresh_success(self, client, requests_mock):
         """Test successful token refresh."""
-        # Mock successful token response
-        mock_response = Mock()
-        mock_response.raise_for_status.return_value = None
-        mock_response.json.return_value = {"access_token": "new-access-token", "expires_in": 3600}
-        mock_post.return_value = mock_response
+        requests_mock.post(client.config.oidc_token_url, json={"access_token": "new-access-token", "expires_in": 3600})
 
-        token = client._get_access_token()
+        with patch("resource_queries.threading.Timer"):
+            token = client._get_access_token()
 
         assert token == "new-access-token"
         assert client._access_token == "new-access-token"
-        mock_post.assert_called_once()
-
-    @patch("resource_queries.requests.post")
-    def test_token_refresh_failure(self, mock_post, client):
+        assert requests_mock.call_count == 1
+        assert "grant_type=refresh_token" in requests_mock.last_request.text
+        assert requests_mock.last_request.timeout == _HTTP_TIMEOUT
+
+    def test_token_refreshed_in_background(self, mock_config):
+        """Test that a refresh arms a timer which renews the token before it expires."""
+        # close() shuts the pooled session, so this test must not borrow the shared client
+        client = FlightControlClient(mock_config)
+        responses = []
+        for token in ("token-a", "token-b"):
+            resp = Mock()
+            resp.content = json.dumps({"access_token": token, "expires_in": 3600}).encode()
+            responses.append(resp)
+
+        with patch("resource_queries.threading.Timer") as mock_timer:
+            with patch.object(client._session, "post", side_effect=responses):
+                assert client._get_access_token() == "token-a"
+                delay, callback = mock_timer.call_args.args
+                assert delay == 3600 - 120
+                mock_timer.return_value.start.assert_called_once()
+
+                callback()  # Timer fires while token-a is still valid
+                assert client._get_access_token() == "token-b"
+
+            client.close()
+        mock_timer.return_value.cancel.assert_called()
+        assert client._refresh_timer is None
+
+    def test_cached_token_skips_lock(self, client):
+        """Test that a valid cached token is returned without taking the refresh lock."""
+        client._access_token = "cached-token"
+        client._token_expiry = time.monotonic() + 3600
+        client._token_lock = MagicMock()
+
+        assert client._get_access_token() == "cached-token"
+        client._token_lock.__enter__.assert_not_called()
+
+    def test_auth_headers_cached_per_token(self, client):
+        """Test that auth headers are reused until the access token changes."""
+        with patch.object(client, "_get_access_token", side_effect=["token-a", "token-a", "token-b"]):
+            first = client._get_auth_headers()
+            second = client._get_auth_headers()
+            third = client._get_auth_headers()
+
+        assert first is second
+        assert first == {"Authorization": "Bearer token-a"}
+        assert third == {"Authorization": "Bearer token-b"}
+
+    def test_token_refresh_failure(self, client, requests_mock):
         """Test token refresh failure handling."""
-        # Mock failed token response
-        mock_response = Mock()
-        mock_response.status_code = 400
-        mock_response.text = "Invalid refresh token"
-        mock_post.side_effect = Exception("HTTP 400: Bad Request")
+        requests_mock.post(client.config.oidc_token_url, status_code=400, text="Invalid refresh token")
 
-        with pytest.raises(AuthenticationError):
+        with pytest.raises(AuthenticationError, match="HTTP 400"):
             client._get_access_token()
 
-    @patch("resource_queries.requests.get")
-    def test_query_devices_success(self, mock_get, client):
+    def test_query_devices_success(self, client, requests_mock):
         """Test successful device query."""
-        # Mock successful API response
-        mock_response = Mock()
-        mock_response.raise_for_status.return_value = None
-        mock_response.json.return_value = {
-            "items": [
-                {"apiVersion": "v1", "kind": "Device", "metadata": {"name": "device-1"}, "spec": {}, "status": {}}
-            ]
-        }
-        mock_get.return_value = mock_response
+        requests_mock.get(
+            DEVICES_URL,
+            json={
+                "items": [
+                    {"apiVersion": "v1", "kind": "Device", "metadata": {"name": "device-1"}, "spec": {}, "status": {}}
+                ]
+            },
+        )
 
         # Mock token refresh
         with patch.object(client, "_get_access_token", return_value="valid-token"):
@@ -201,137 +351,381 @@ class TestFlightControlClient:
 
         assert len(devices) == 1
         assert devices[0]["metadata"]["name"] == "device-1"
-        mock_get.assert_called_once()
+        assert requests_mock.call_count == 1
+        assert requests_mock.last_request.headers["Authorization"] == "Bearer valid-token"
+        assert requests_mock.last_request.timeout == _HTTP_TIMEOUT
+
+    def test_query_devices_pagination(self, client, requests_mock):
+        """Test that continue tokens are followed across pages on the shared session."""
+        requests_mock.get(
+            DEVICES_URL,
+            [
+                {"json": {"items": [{"metadata": {"name": "device-1"}}], "continue": "token-2"}},
+                {"json": {"items": [{"metadata": {"name": "device-2"}}]}},
+            ],
+        )
 
-    @patch("resource_queries.requests.get")
-    def test_query_devices_http_error(self, mock_get, client):
-        """Test device query with HTTP error."""
-        # Mock HTTP error response
-        import requests
+        with patch.object(client, "_get_access_token", return_value="valid-token"):
+            devices = client.query_devices(label_selector="env=prod")
+
+        assert [d["metadata"]["name"] for d in devices] == ["device-1", "device-2"]
+        first, second = requests_mock.request_history
+        assert first.qs == {"labelSelector": ["env=prod"]}
+        assert second.qs == {"labelSelector": ["env=prod"], "continue": ["token-2"]}
+
+    def test_query_devices_limit_skips_prefetch(self, client, requests_mock):
+        """Test that no further page is requested once the limit is satisfied."""
+        requests_mock.get(DEVICES_URL, json={"items": [{"metadata": {"name": "device-1"}}], "continue": "token-2"})
+
+        with patch.object(client, "_get_access_token", return_value="valid-token"):
+            devices = client.query_devices(limit=1)
+
+        assert len(devices) == 1
+        assert requests_mock.call_count == 1
+        assert requests_mock.last_request.qs["limit"] == ["1"]
 
-        mock_response = Mock()
-        mock_response.status_code = 404
-        mock_response.reason = "Not Found"
-        error = requests.exceptions.HTTPError()
-        error.response = mock_response
-        mock_get.side_effect = error
+    def test_query_devices_limit_sets_page_size(self, client, requests_mock):
+        """Test that each page requests only the items still needed, capped at the server maximum."""
+        pages = [
+            {"json": {"items": [{"metadata": {"name": "device-1"}}], "continue": "token-2"}},
+            {"json": {"items": [{"metadata": {"name": "device-2"}}]}},
+        ]
+        requests_mock.get(DEVICES_URL, pages + pages)
+
+        with patch.object(client, "_get_access_token", return_value="valid-token"):
+            client.query_devices(limit=2500)
+            client.query_devices(limit=3)
+
+        assert [r.qs["limit"] for r in requests_mock.request_history] == [["1000"], ["1000"], ["3"], ["2"]]
+
+    def test_iter_resources_streams_pages(self, client):
+        """Test that iter_resources yields page 1 before page 2 has been consumed."""
+        page1, page2 = Mock(), Mock()
+        page1.content = json.dumps({"items": [{"metadata": {"name": "device-1"}}], "continue": "token-2"}).encode()
+        page2.content = json.dumps({"items": [{"metadata": {"name": "device-2"}}]}).encode()
+
+        with patch.object(client, "_get_access_token", return_value="valid-token"):
+            with patch.object(client._session, "get", side_effect=[page1, page2]):
+                stream = client.iter_resources("devices")
+                assert next(stream)["metadata"]["name"] == "device-1"
+                assert [d["metadata"]["name"] for d in stream] == ["device-2"]
+
+    def test_identical_concurrent_queries_share_one_fetch(self, client):
+        """Test that a query issued while an identical one is in flight reuses its result."""
+        started, release = threading.Event(), threading.Event()
+        page = Mock()
+        page.content = json.dumps({"items": [{"metadata": {"name": "device-1"}}]}).encode()
+
+        def slow_get(*args, **kwargs):
+            started.set()
+            release.wait(5)
+            return page
+
+        results = []
+        with patch.object(client, "_get_access_token", return_value="valid-token"):
+            with patch.object(client._session, "get", side_effect=slow_get) as mock_get:
+                leader = threading.Thread(target=lambda: results.append(client.query_devices(label_selector="a=b")))
+                leader.start()
+                assert started.wait(5)
+                follower = threading.Thread(target=lambda: results.append(client.query_devices(label_selector="a=b")))
+                follower.start()
+                follower.join(0.1)  # The follower blocks on the leader's result
+                release.set()
+                leader.join(5)
+                follower.join(5)
+
+        assert mock_get.call_count == 1
+        assert results[0] == results[1] == [{"metadata": {"name": "device-1"}}]
+        assert client._inflight == {}
+
+    def test_query_devices_http_error(self, client, requests_mock):
+        """Test device query with HTTP error."""
+        requests_mock.get(DEVICES_URL, status_code=404, reason="Not Found")
 
         # Mock token refresh
         with patch.object(client, "_get_access_token", return_value="valid-token"):
             with pytest.raises(APIError, match="Resource not found"):
                 client.query_devices()
 
+    @pytest.mark.parametrize(
+        "run_result,expectation",
+        [
+            (Mock(stdout="command output"), nullcontext()),
+            (
+                subprocess.CalledProcessError(1, ["flightctl"], stderr="Command failed"),
+                pytest.raises(FlightControlError, match="Failed to login"),
+            ),
+        ],
+        ids=["success", "failure"],
+    )
+    def test_console_command_outcome(self, client, run_result, expectation):
+        """Test console command execution succeeding, and failing at login."""
+        with patch("resource_queries.subprocess.run") as mock_run:
+            if isinstance(run_result, Exception):
+                mock_run.side_effect = run_result
+            else:
+                mock_run.return_value = run_result
+
+            # Mock token refresh and CLI check
+            with patch.object(client, "_get_access_token", return_value="valid-token"):
+                with patch("resource_queries.shutil.which", return_value="/usr/bin/flightctl"):
+                    with expectation:
+                        result = client.run_console_command("/usr/bin/flightctl", "test-device", "ps aux")
+
+        if isinstance(run_result, Exception):
+            assert mock_run.call_count == 1  # Stopped at login
+        else:
+            assert result == "command output"
+            assert mock_run.call_count == 2  # login + command
+
     @patch("resource_queries.subprocess.run")
-    def test_console_command_success(self, mock_run, client):
-        """Test successful console command execution."""
-        # Mock successful command execution
-        mock_result = Mock()
-        mock_result.stdout = "command output"
-        mock_run.return_value = mock_result
-
-        # Mock token refresh and CLI check
+    def test_console_command_path_lookup_cached(self, mock_run, client):
+        """Test that PATH is searched for flightctl only until it is found."""
+        mock_run.return_value = Mock(stdout="")
+
         with patch.object(client, "_get_access_token", return_value="valid-token"):
-            with patch("resource_queries.shutil.which", return_value="/usr/bin/flightctl"):
-                result = client.run_console_command("/usr/bin/flightctl", "test-device", "ps aux")
+            with patch("resource_queries.shutil.which", side_effect=[None, "/usr/bin/flightctl"]) as mock_which:
+                with pytest.raises(FlightControlError, match="not found"):
+                    client.run_console_command("/usr/bin/flightctl", "test-device", "uptime")
+                client.run_console_command("/usr/bin/flightctl", "test-device", "uptime")
+                client.run_console_command("/usr/bin/flightctl", "test-device", "uptime")
 
-        assert result == "command output"
-        assert mock_run.call_count == 2  # login + command
+        assert mock_which.call_count == 2
 
     @patch("resource_queries.subprocess.run")
-    def test_console_command_failure(self, mock_run, client):
-        """Test console command execution failure."""
-        import subprocess
+    def test_console_command_quoted_arguments(self, mock_run, client):
+        """Test that quoted arguments reach the device as single argv entries."""
+        mock_run.return_value = Mock(stdout="")
 
-        # Mock command execution failure
-        error = subprocess.CalledProcessError(1, ["flightctl"], stderr="Command failed")
-        mock_run.side_effect = error
-
-        # Mock token refresh and CLI check
         with patch.object(client, "_get_access_token", return_value="valid-token"):
             with patch("resource_queries.shutil.which", return_value="/usr/bin/flightctl"):
-                with pytest.raises(FlightControlError, match="Failed to login"):
-                    client.run_console_command("/usr/bin/flightctl", "test-device", "ps aux")
+                client.run_console_command("/usr/bin/flightctl", "test-device", "grep 'two words' /var/log/messages")
+
+        assert mock_run.call_args.args[0] == [
+            "/usr/bin/flightctl",
+            "console",
+            "device/test-device",
+            "--",
+            "grep",
+            "two words",
+            "/var/log/messages",
+        ]
+
+    @patch("resource_queries.subprocess.run")
+    def test_console_command_reuses_login(self, mock_run, client):
+        """Test that console login is skipped while the CLI is logged in with the same token."""
+        mock_run.return_value = Mock(stdout="command output")
+        client._token_expiry = time.monotonic() + 3600
+
+        with patch.object(client, "_get_access_token", side_effect=["token-a", "token-a", "token-b"]):
+            with patch("resource_queries.shutil.which", return_value="/usr/bin/flightctl"):
+                for _ in range(3):
+                    client.run_console_command("/usr/bin/flightctl", "test-device", "uptime")
+
+        logins = [c for c in mock_run.call_args_list if c.args[0][2] == "login"]
+        assert len(logins) == 2  # token-a once, then again for token-b
+        assert mock_run.call_count == 5
 
 
 class TestCLI:
     """Test FlightctlCLI functionality."""
 
-    def test_cli_initialization(self):
+    @pytest.fixture(scope="class")
+    def _cli_patches(self):
+        """Patch the CLI's PATH lookup and HTTP download once for the whole class."""
+        with patch("cli.shutil.which") as mock_which, patch("cli.requests.get") as mock_get:
+            yield {"which": mock_which, "get": mock_get}
+
+    @pytest.fixture
+    def cli_env(self, _cli_patches, tmp_path, monkeypatch):
+        """Reset the shared patches and install the CLI into tmp_path; PATH changes are undone afterwards."""
+        for mock in _cli_patches.values():
+            mock.reset_mock(return_value=True, side_effect=True)
+        _cli_patches["which"].return_value = None  # CLI not found
+        monkeypatch.setenv("FLIGHTCTL_CLI_DIR", str(tmp_path))
+        monkeypatch.setenv("PATH", os.environ.get("PATH", ""))
+        return _cli_patches
+
+    def test_cli_initialization(self, cli_env):
         """Test CLI initialization."""
         cli = FlightctlCLI("https://api.test.com")
         assert cli.api_url == "https://api.test.com"
         assert cli.arch == "amd64"
         assert cli.os_name == "linux"
+        assert cli.cli_url == "https://cli-artifacts.test.com/amd64/linux/flightctl-linux-amd64.tar.gz"
 
-    @patch("cli.shutil.which")
-    def test_download_skip_existing(self, mock_which):
+    def test_download_skip_existing(self, cli_env):
         """Test skipping download when CLI already exists."""
-        mock_which.return_value = "/usr/local/bin/flightctl"
+        cli_env["which"].return_value = "/usr/local/bin/flightctl"
 
         cli = FlightctlCLI("https://api.test.com")
         cli.download()
 
         assert cli.cli_path == "/usr/local/bin/flightctl"
 
-    @patch("cli.shutil.which")
-    @patch("cli.subprocess.run")
-    @patch("cli.shutil.move")
-    @patch("cli.os.chmod")
-    @patch("cli.os.makedirs")
-    @patch("cli.os.path.isfile")
-    @patch("cli.tempfile.TemporaryDirectory")
-    def test_download_success(
-        self, mock_tempdir, mock_isfile, mock_makedirs, mock_chmod, mock_move, mock_run, mock_which
-    ):
+    @staticmethod
+    def _cli_tarball(content=b"#!/bin/sh\necho flightctl\n"):
+        """Build an in-memory flightctl-linux-amd64.tar.gz."""
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w:gz") as archive:
+            info = tarfile.TarInfo("flightctl")
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+        buf.seek(0)
+        return buf
+
+    def test_download_success(self, cli_env, tmp_path):
         """Test successful CLI download."""
-        mock_which.return_value = None  # CLI not found
-        mock_tempdir.return_value.__enter__.return_value = "/tmp/test"
-        mock_isfile.return_value = True  # Simulate successful extraction
+        mock_get = cli_env["get"]
+        mock_get.return_value.__enter__.return_value.raw = self._cli_tarball(b"binary")
 
         cli = FlightctlCLI("https://api.test.com")
         cli.download()
 
-        # Verify download steps were called
-        assert mock_run.call_count == 2  # curl + tar
-        mock_move.assert_called_once()
-        mock_chmod.assert_called_once()
-        mock_isfile.assert_called_once_with("/tmp/test/flightctl")
+        # Verify the archive was streamed and the binary installed
+        assert mock_get.call_args.kwargs["stream"] is True
+        assert mock_get.call_args.kwargs["verify"] is True
+        assert mock_get.call_args.args[0] == "https://cli-artifacts.test.com/amd64/linux/flightctl-linux-amd64.tar.gz"
+        installed = tmp_path / "flightctl"
+        assert installed.read_bytes() == b"binary"
+        assert os.access(installed, os.X_OK)
+
+    @patch("cli._SEGMENTED_MIN_SIZE", 1)
+    def test_download_parallel_ranges(self, cli_env, tmp_path):
+        """Test that range-capable servers are downloaded in parallel segments."""
+        mock_get = cli_env["get"]
+        payload = os.urandom(4096)
+        archive = self._cli_tarball(payload).getvalue()
+        cli_url = "https://cli-artifacts.test.com/amd64/linux/flightctl-linux-amd64.tar.gz"
+
+        def fake_get(url, headers=None, **kwargs):
+            resp = Mock()
+            resp.url = url
+            range_header = (headers or {}).get("Range")
+            if range_header:
+                start, last = (int(x) for x in range_header.split("=")[1].split("-"))
+                resp.status_code = 206
+                resp.raw = io.BytesIO(archive[start:][: last - start + 1])
+            else:
+                resp.status_code = 200
+                resp.headers = {"Accept-Ranges": "bytes", "Content-Length": str(len(archive))}
+                resp.raw = io.BytesIO(archive)
+            ctx = Mock()
+            ctx.__enter__ = Mock(return_value=resp)
+            ctx.__exit__ = Mock(return_value=False)
+            return ctx
+
+        mock_get.side_effect = fake_get
+
+        FlightctlCLI("https://api.test.com").download()
+
+        ranges = [c.kwargs["headers"].get("Range") for c in mock_get.call_args_list]
+        assert mock_get.call_args_list[0].args[0] == cli_url
+        assert len([r for r in ranges if r]) == 3  # First segment comes from the initial response
+        assert (tmp_path / "flightctl").read_bytes() == payload
+
+    def test_download_uses_cached_binary(self, cli_env, tmp_path):
+        """Test that a verified binary from a previous install is reused."""
+        mock_get = cli_env["get"]
+        mock_get.return_value.__enter__.return_value.raw = self._cli_tarball(b"binary")
+
+        FlightctlCLI("https://api.test.com").download()
+        FlightctlCLI("https://api.test.com").download()
+
+        assert mock_get.call_count == 1
+        assert (tmp_path / "flightctl.sha256").exists()
+
+    def test_cached_binary_skips_rehash_when_unchanged(self, cli_env, tmp_path):
+        """Test that an unchanged cached binary is accepted from its stat alone."""
+        binary = tmp_path / "flightctl"
+        binary.write_bytes(b"binary")
+        binary.chmod(0o755)
+        st = binary.stat()
+        (tmp_path / "flightctl.sha256").write_text(f"not-a-real-digest {st.st_size} {st.st_mtime_ns}\n")
+
+        cli = FlightctlCLI("https://api.test.com")
+        with patch("cli.hashlib.sha256") as mock_sha256:
+            assert cli._is_installed()
+        mock_sha256.assert_not_called()
+
+    def test_download_replaces_tampered_binary(self, cli_env, tmp_path):
+        """Test that a cached binary failing its checksum is re-downloaded."""
+        mock_get = cli_env["get"]
+        mock_get.return_value.__enter__.return_value.raw = self._cli_tarball(b"binary")
+
+        FlightctlCLI("https://api.test.com").download()
+        (tmp_path / "flightctl").write_bytes(b"corrupted")
+        mock_get.return_value.__enter__.return_value.raw = self._cli_tarball(b"binary")
+        FlightctlCLI("https://api.test.com").download()
+
+        assert mock_get.call_count == 2
+        assert (tmp_path / "flightctl").read_bytes() == b"binary"
+
+    @pytest.mark.parametrize("mid_stream", [False, True], ids=["connect", "mid-stream"])
+    def test_download_failure(self, cli_env, tmp_path, mid_stream):
+        """Test that a failed download, including a connection reset while streaming, is reported."""
+        mock_get = cli_env["get"]
+        if mid_stream:
+            reset = urllib3.exceptions.ProtocolError("Connection broken", ConnectionResetError(104, "reset"))
+            mock_get.return_value.__enter__.return_value.raw.read.side_effect = reset
+        else:
+            mock_get.side_effect = requests.exceptions.ConnectionError("unreachable")
+
+        cli = FlightctlCLI("https://api.test.com")
+        with pytest.raises(RuntimeError, match="Failed to download"):
+            cli.download()
+
+        assert list(tmp_path.iterdir()) == []  # No partial binary left behind
+
+    def test_download_archive_without_binary(self, cli_env, tmp_path):
+        """Test that an archive lacking the flightctl binary is rejected."""
+        mock_get = cli_env["get"]
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w:gz") as archive:
+            archive.addfile(tarfile.TarInfo("README"), io.BytesIO(b""))
+        buf.seek(0)
+        mock_get.return_value.__enter__.return_value.raw = buf
+
+        cli = FlightctlCLI("https://api.test.com")
+        with pytest.raises(RuntimeError, match="Failed to extract flightctl binary"):
+            cli.download()
+
+        assert list(tmp_path.iterdir()) == []
 
 
 class TestIntegration:
     """Integration tests that can run against a real Flight Control instance."""
 
-    @pytest.fixture
-    def live_config(self):
-        """Get configuration for live testing (requires environment setup)."""
-        config = Configuration()
-        if not config.api_base_url:
-            pytest.skip("No live Flight Control instance configured")
-        return config
-
-    @pytest.fixture
-    def live_client(self, live_config):
-        """Create client for live testing."""
-        return FlightControlClient(live_config)
+    @pytest.fixture(scope="class")
+    def live_client(self, live_config, live_reachable):
+        """Create one client for the live tests, sharing its pooled connections."""
+        if not live_reachable:
+            pytest.skip(f"Flight Control API at {live_config.api_base_url} is unreachable")
+        client = FlightControlClient(live_config)
+        yield client
+        client.close()
 
     @pytest.mark.integration
-    def test_live_device_query(self, live_client):
-        """Test querying devices from live instance."""
+    @pytest.mark.parametrize(
+        "method_name",
+        [
+            "query_devices",
+            "query_fleets",
+            "query_events",
+            "query_enrollment_requests",
+            "query_repositories",
+            "query_resource_syncs",
+        ],
+    )
+    def test_live_query(self, live_client, method_name):
+        """Test each resource query against the live instance."""
         try:
-            devices = live_client.query_devices(limit=1)
-            assert isinstance(devices, list)
+            items = getattr(live_client, method_name)(limit=3)
+            assert isinstance(items, list)
+            assert len(items) <= 3
             # Don't assert on specific content since it depends on cluster state
         except Exception as e:
-            pytest.fail(f"Live device query failed: {e}")
-
-    @pytest.mark.integration
-    def test_live_fleet_query(self, live_client):
-        """Test querying fleets from live instance."""
-        try:
-            fleets = live_client.query_fleets(limit=1)
-            assert isinstance(fleets, list)
-        except Exception as e:
-            pytest.fail(f"Live fleet query failed: {e}")
+            pytest.fail(f"Live {method_name} failed: {e}")
 
 
 class TestLogging:
@@ -349,6 +743,21 @@ class TestLogging:
                 logger = setup_logging()
                 assert logger is not None
 
+    def test_logging_setup_closes_previous_handlers(self):
+        """Test that re-running setup closes the previous buffered handler and its log file."""
+        with patch("logging.handlers.RotatingFileHandler") as mock_handler:
+            first, second = Mock(level=logging.INFO), Mock(level=logging.INFO)
+            mock_handler.side_effect = [first, second]
+
+            with patch("pathlib.Path.mkdir"):
+                logger = setup_logging()
+                buffered = logger.handlers[0]
+                setup_logging()
+
+        first.close.assert_called_once()
+        assert buffered not in logger.handlers
+        assert len(logger.handlers) == 1
+
 
 if __name__ == "__main__":
     # Run tests with pytest
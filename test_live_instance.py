@@ -8,6 +8,7 @@ It requires that you have already run 'flightctl login'.
 
 import sys
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from resource_queries import Configuration, FlightControlClient, setup_logging
 
 
@@ -45,71 +46,31 @@ def test_api_queries(client):
     """Test various API queries."""
     print("\n🔍 Testing API queries...")
 
-    results = {}
-
-    # Test device query
-    try:
-        print("   Testing device query...")
-        devices = client.query_devices(limit=3)
-        results["devices"] = len(devices)
-        print(f"   ✅ Found {len(devices)} devices")
-        if devices:
-            print(f"      Example device: {devices[0].get('metadata', {}).get('name', 'unnamed')}")
-    except Exception as e:
-        print(f"   ❌ Device query failed: {e}")
-        results["devices"] = "error"
-
-    # Test fleet query
-    try:
-        print("   Testing fleet query...")
-        fleets = client.query_fleets(limit=3)
-        results["fleets"] = len(fleets)
-        print(f"   ✅ Found {len(fleets)} fleets")
-        if fleets:
-            print(f"      Example fleet: {fleets[0].get('metadata', {}).get('name', 'unnamed')}")
-    except Exception as e:
-        print(f"   ❌ Fleet query failed: {e}")
-        results["fleets"] = "error"
-
-    # Test event query
-    try:
-        print("   Testing event query...")
-        events = client.query_events(limit=3)
-        results["events"] = len(events)
-        print(f"   ✅ Found {len(events)} events")
-    except Exception as e:
-        print(f"   ❌ Event query failed: {e}")
-        results["events"] = "error"
+    queries = {
+        "devices": ("device", lambda: client.query_devices(limit=3)),
+        "fleets": ("fleet", lambda: client.query_fleets(limit=3)),
+        "events": ("event", lambda: client.query_events(limit=3)),
+        "enrollment_requests": ("enrollment request", lambda: client.query_enrollment_requests(limit=3)),
+        "repositories": ("repository", lambda: client.query_repositories(limit=3)),
+        "resource_syncs": ("resource sync", lambda: client.query_resource_syncs(limit=3)),
+    }
 
-    # Test enrollment requests
-    try:
-        print("   Testing enrollment request query...")
-        enrollment_requests = client.query_enrollment_requests(limit=3)
-        results["enrollment_requests"] = len(enrollment_requests)
-        print(f"   ✅ Found {len(enrollment_requests)} enrollment requests")
-    except Exception as e:
-        print(f"   ❌ Enrollment request query failed: {e}")
-        results["enrollment_requests"] = "error"
+    # The queries are independent, so run them concurrently over the client's pooled session
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        futures = {resource: executor.submit(query) for resource, (_, query) in queries.items()}
 
-    # Test repositories
-    try:
-        print("   Testing repository query...")
-        repositories = client.query_repositories(limit=3)
-        results["repositories"] = len(repositories)
-        print(f"   ✅ Found {len(repositories)} repositories")
-    except Exception as e:
-        print(f"   ❌ Repository query failed: {e}")
-        results["repositories"] = "error"
-
-    # Test resource syncs
-    try:
-        print("   Testing resource sync query...")
-        resource_syncs = client.query_resource_syncs(limit=3)
-        results["resource_syncs"] = len(resource_syncs)
-        print(f"   ✅ Found {len(resource_syncs)} resource syncs")
-    except Exception as e:
-        print(f"   ❌ Resource sync query failed: {e}")
-        results["resource_syncs"] = "error"
+    results = {}
+    for resource, (label, _) in queries.items():
+        print(f"   Testing {label} query...")
+        try:
+            items = futures[resource].result()
+            results[resource] = len(items)
+            print(f"   ✅ Found {len(items)} {resource.replace('_', ' ')}")
+            if items and resource in ("devices", "fleets"):
+                print(f"      Example {label}: {items[0].get('metadata', {}).get('name', 'unnamed')}")
+        except Exception as e:
+            print(f"   ❌ {label.capitalize()} query failed: {e}")
+            results[resource] = "error"
 
     return results
 
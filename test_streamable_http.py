@@ -1,145 +1,149 @@
 #!/usr/bin/env python3
 """
 Test script to verify streamable-http transport is working.
-This script tests the MCP server by starting it and making a simple client connection.
+This script tests the MCP server by serving its ASGI app in-process and making a simple client request.
 """
 
 import asyncio
 import os
-import sys
 import subprocess
+import sys
 import time
-import requests
 
+import httpx
+import pytest
+
+# JSON-RPC initialize request a streamable-http client sends first
+_INITIALIZE_REQUEST = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {"protocolVersion": "2025-03-26", "capabilities": {}, "clientInfo": {"name": "test", "version": "0"}},
+}
 
+
+# Share one session-wide event loop with any other async tests instead of a loop per test
+@pytest.mark.asyncio(loop_scope="session")
 async def test_server():
-    """Test that the server starts up with streamable-http transport."""
+    """Test that the server answers an MCP initialize over the streamable-http transport, served in-process."""
     print("🔧 Testing MCP Server with streamable-http transport...")
+    pytest.importorskip("mcp.server.fastmcp", reason="FastMCP (mcp<2) is not installed")
+
+    from main import mcp
+
+    # Serve the ASGI app in-process instead of spawning main.py and waiting on a real socket
+    app = mcp.streamable_http_app()
+    print("   Transport: streamable-http (in-process ASGI)")
+
+    # Running the lifespan starts the session manager; once entered, the app is ready.
+    # A loopback base URL keeps the request inside the server's allowed Host headers.
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://127.0.0.1:8000") as client:
+            print("   Testing endpoint: /mcp")
+            response = await client.post(
+                "/mcp",
+                json=_INITIALIZE_REQUEST,
+                headers={"Accept": "application/json, text/event-stream"},
+                timeout=5,
+            )
+
+    print(f"   Response status: {response.status_code}")
+    assert response.status_code == 200, response.text
+    assert '"serverInfo":{"name":"mcp-server"' in response.text
+    print("✅ Server is responding to MCP requests")
+
+
+@pytest.mark.subprocess_server
+def test_server_subprocess():
+    """Test that main.py starts as a real process and serves streamable-http on a TCP port."""
+    print("🔧 Testing MCP Server process with streamable-http transport...")
+    pytest.importorskip("mcp.server.fastmcp", reason="FastMCP (mcp<2) is not installed")
 
-    # Set environment variables for testing
     env = os.environ.copy()
     env["MCP_TRANSPORT"] = "streamable-http"
     env["MCP_HOST"] = "127.0.0.1"
     env["MCP_PORT"] = "8001"  # Use different port to avoid conflicts
+    url = f"http://{env['MCP_HOST']}:{env['MCP_PORT']}/mcp"
 
-    print(f"   Transport: {env['MCP_TRANSPORT']}")
-    print(f"   Host: {env['MCP_HOST']}")
-    print(f"   Port: {env['MCP_PORT']}")
-
-    # Start the server in a subprocess
-    server_process = None
+    server_process = subprocess.Popen(
+        [sys.executable, "main.py"], env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
     try:
-        print("   Starting MCP server...")
-        server_process = subprocess.Popen(
-            [sys.executable, "main.py"], env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-        )
-
-        # Give the server time to start
-        print("   Waiting for server to start...")
-        time.sleep(3)
-
-        # Check if server is running
-        if server_process.poll() is not None:
-            stdout, stderr = server_process.communicate()
-            print("❌ Server failed to start:")
-            print(f"   stdout: {stdout}")
-            print(f"   stderr: {stderr}")
-            return False
-
-        # Try to make a health check request
-        url = f"http://{env['MCP_HOST']}:{env['MCP_PORT']}/mcp"
-        print(f"   Testing endpoint: {url}")
-
-        try:
-            # The MCP endpoint might not respond to GET requests normally,
-            # but we should at least get a connection
-            response = requests.get(url, timeout=5)
-            print(f"   Response status: {response.status_code}")
-            print("✅ Server is responding to HTTP requests")
-            return True
-        except requests.ConnectionError:
-            print("❌ Could not connect to server")
-            return False
-        except requests.Timeout:
-            print("❌ Server connection timed out")
-            return False
-        except Exception as e:
-            print(f"❌ Unexpected error: {e}")
-            return False
-
-    except Exception as e:
-        print(f"❌ Error starting server: {e}")
-        return False
-    finally:
-        if server_process:
-            print("   Stopping server...")
-            server_process.terminate()
+        # Poll until the server answers rather than sleeping a fixed amount
+        deadline = time.monotonic() + 10
+        while True:
+            if server_process.poll() is not None:
+                stdout, stderr = server_process.communicate()
+                pytest.fail(f"Server failed to start:\n   stdout: {stdout}\n   stderr: {stderr}")
             try:
-                server_process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                server_process.kill()
-                server_process.wait()
+                response = httpx.post(
+                    url,
+                    json=_INITIALIZE_REQUEST,
+                    headers={"Accept": "application/json, text/event-stream"},
+                    timeout=1,
+                )
+                break
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    pytest.fail(f"Could not connect to server at {url}")
+                time.sleep(0.1)
+
+        print(f"   Response status: {response.status_code}")
+        assert response.status_code == 200, response.text
+        assert '"serverInfo":{"name":"mcp-server"' in response.text
+        print("✅ Server process is responding to MCP requests")
+    finally:
+        server_process.terminate()
+        try:
+            server_process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            server_process.kill()
+            server_process.wait()
 
 
 def test_imports():
     """Test that all required imports are available."""
     print("🔧 Testing imports...")
 
-    try:
-        from mcp.server.fastmcp import FastMCP
+    from mcp.server.fastmcp import FastMCP
 
-        # Verify the class exists and has expected attributes
-        assert hasattr(FastMCP, "run"), "FastMCP should have a run method"
-        print("✅ FastMCP import successful")
-    except ImportError as e:
-        print(f"❌ FastMCP import failed: {e}")
-        return False
-
-    try:
-        import uvicorn
+    # Verify the class exists and has expected attributes
+    assert hasattr(FastMCP, "run"), "FastMCP should have a run method"
+    print("✅ FastMCP import successful")
 
-        # Verify uvicorn has the run function we need
-        assert hasattr(uvicorn, "run"), "uvicorn should have a run function"
-        print("✅ Uvicorn import successful")
-    except ImportError as e:
-        print(f"❌ Uvicorn import failed: {e}")
-        return False
+    import uvicorn
 
-    return True
+    # Verify uvicorn has the run function we need
+    assert hasattr(uvicorn, "run"), "uvicorn should have a run function"
+    print("✅ Uvicorn import successful")
 
 
-def test_configuration():
+def test_configuration(monkeypatch):
     """Test configuration parsing."""
     print("🔧 Testing configuration...")
+    pytest.importorskip("mcp.server.fastmcp", reason="FastMCP (mcp<2) is not installed")
 
-    # Test with streamable-http transport
-    test_env = {"MCP_TRANSPORT": "streamable-http", "MCP_HOST": "0.0.0.0", "MCP_PORT": "9000"}
+    from main import _read_transport_config
 
-    old_env = {}
-    for key, value in test_env.items():
-        old_env[key] = os.environ.get(key)
-        os.environ[key] = value
+    monkeypatch.setenv("MCP_TRANSPORT", "streamable-http")
+    monkeypatch.setenv("MCP_HOST", "0.0.0.0")
+    monkeypatch.setenv("MCP_PORT", "9000")
+    assert _read_transport_config() == ("streamable-http", "0.0.0.0", 9000)
 
-    try:
-        # Import and check the configuration parsing
-        transport_env = os.environ.get("MCP_TRANSPORT", "streamable-http")
-        host = os.environ.get("MCP_HOST", "127.0.0.1")
-        port = int(os.environ.get("MCP_PORT", "8000"))
-
-        if transport_env == "streamable-http" and host == "0.0.0.0" and port == 9000:
-            print("✅ Configuration parsing working correctly")
-            return True
-        else:
-            print(f"❌ Configuration parsing failed: transport={transport_env}, host={host}, port={port}")
-            return False
+    # stdio never binds a port, so a malformed MCP_PORT is ignored there and reported for HTTP
+    monkeypatch.setenv("MCP_PORT", "not-a-port")
+    with pytest.raises(ValueError, match="MCP_PORT must be an integer"):
+        _read_transport_config()
+    monkeypatch.setenv("MCP_TRANSPORT", "stdio")
+    assert _read_transport_config() == ("stdio", "0.0.0.0", None)
+    print("✅ Configuration parsing working correctly")
 
-    finally:
-        # Restore environment
-        for key, value in old_env.items():
-            if value is None:
-                os.environ.pop(key, None)
-            else:
-                os.environ[key] = value
+
+def _with_monkeypatch(test_func):
+    """Run a test that takes pytest's monkeypatch fixture outside pytest."""
+    with pytest.MonkeyPatch.context() as mp:
+        return test_func(mp)
 
 
 async def main():
@@ -149,7 +153,7 @@ async def main():
 
     tests = [
         ("Import Test", test_imports),
-        ("Configuration Test", test_configuration),
+        ("Configuration Test", lambda: _with_monkeypatch(test_configuration)),
         ("Server Test", test_server),
     ]
 
@@ -161,7 +165,10 @@ async def main():
                 result = await test_func()
             else:
                 result = test_func()
-            results[test_name] = result
+            # Assert-based tests return None when they pass
+            results[test_name] = result is not False
+        except pytest.skip.Exception as e:
+            print(f"⏭️  {test_name} skipped: {e}")
         except Exception as e:
             print(f"💥 {test_name} failed with exception: {e}")
             results[test_name] = False